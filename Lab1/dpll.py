@@ -0,0 +1,284 @@
+import sys
+
+sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+
+def normalize_clauses(clauses):
+    """
+    Turns the clauses into frozensets of literals, dropping tautologies and repeated literals.
+    Returns None if the formula contains an empty clause.
+    """
+    normalized = set()
+    for clause in clauses:
+        literals = frozenset(clause)
+        if not literals:
+            return None
+        if any(-literal in literals for literal in literals):
+            continue
+        normalized.add(literals)
+    return frozenset(normalized)
+
+
+def variables_of(clauses):
+    return {abs(literal) for clause in clauses for literal in clause}
+
+
+def unit_propagate(clauses, literals):
+    """
+    Assigns the given literals and everything they force by unit propagation.
+    Returns the simplified clauses and the number of variables assigned, or (None, 0) on a conflict.
+    """
+    assigned = set()
+    pending = list(literals)
+
+    while pending:
+        literal = pending.pop()
+        if literal in assigned:
+            continue
+        if -literal in assigned:
+            return None, 0
+        assigned.add(literal)
+
+        simplified = []
+        for clause in clauses:
+            if literal in clause:
+                continue
+            if -literal in clause:
+                clause = clause - {-literal}
+                if not clause:
+                    return None, 0
+                if len(clause) == 1:
+                    pending.extend(clause)
+            simplified.append(clause)
+        clauses = simplified
+
+    return frozenset(clauses), len(assigned)
+
+
+def split_components(clauses):
+    """
+    Splits the clauses into groups that share no variables.
+    """
+    parent = {}
+
+    def find(var):
+        while parent[var] != var:
+            parent[var] = parent[parent[var]]
+            var = parent[var]
+        return var
+
+    for clause in clauses:
+        variables = [abs(literal) for literal in clause]
+        for var in variables:
+            parent.setdefault(var, var)
+        root = find(variables[0])
+        for var in variables[1:]:
+            other = find(var)
+            if other != root:
+                parent[other] = root
+
+    components = {}
+    for clause in clauses:
+        components.setdefault(find(abs(next(iter(clause)))), []).append(clause)
+    return [frozenset(component) for component in components.values()]
+
+
+def count_component(clauses, cache):
+    """
+    Counts the models of a unit-free formula over its own variables.
+    Independent components are counted separately and every sub-formula's count is cached.
+    """
+    if not clauses:
+        return 1
+    if clauses in cache:
+        return cache[clauses]
+
+    components = split_components(clauses)
+    if len(components) > 1:
+        result = 1
+        for component in components:
+            result *= count_component(component, cache)
+            if not result:
+                break
+        cache[clauses] = result
+        return result
+
+    # Branch on the variable that occurs most often.
+    occurrences = {}
+    for clause in clauses:
+        for literal in clause:
+            occurrences[abs(literal)] = occurrences.get(abs(literal), 0) + 1
+    branch_var = max(occurrences, key=occurrences.get)
+    num_vars = len(occurrences)
+
+    result = 0
+    for literal in (branch_var, -branch_var):
+        simplified, num_assigned = unit_propagate(clauses, [literal])
+        if simplified is None:
+            continue
+        free_vars = num_vars - num_assigned - len(variables_of(simplified))
+        result += count_component(simplified, cache) << free_vars
+
+    cache[clauses] = result
+    return result
+
+
+def count_models(num_variables, clauses):
+    """
+    Exact number of satisfying assignments (#SAT) over variables 1..num_variables.
+    """
+    normalized = normalize_clauses(clauses)
+    if normalized is None:
+        return 0
+
+    units = [literal for clause in normalized if len(clause) == 1 for literal in clause]
+    num_assigned = 0
+    if units:
+        normalized, num_assigned = unit_propagate(normalized, units)
+        if normalized is None:
+            return 0
+
+    free_vars = num_variables - num_assigned - len(variables_of(normalized))
+    return count_component(normalized, {}) << free_vars
+
+
+class CubeEnumerator:
+    """
+    DPLL backtracking with two watched literals per clause.
+    Every leaf where all clauses are satisfied is reported as a cube: a partial assignment
+    whose unassigned variables are free, so each cube stands for 2^free solutions.
+    The cubes are disjoint and together cover every solution exactly once.
+    """
+
+    def __init__(self, num_variables, clauses):
+        self.num_variables = num_variables
+        self.values = [None] * (num_variables + 1)
+        self.watches = {}
+        self.clauses = []
+        self.units = []
+        self.unsatisfiable = False
+
+        for clause in clauses:
+            literals = list(dict.fromkeys(clause))
+            if any(-literal in literals for literal in literals):
+                continue
+            if not literals:
+                self.unsatisfiable = True
+            elif len(literals) == 1:
+                self.units.append(literals[0])
+            else:
+                self.clauses.append(literals)
+
+        # The first two literals of every clause are its watches.
+        for clause_index, clause in enumerate(self.clauses):
+            self.watches.setdefault(clause[0], []).append(clause_index)
+            self.watches.setdefault(clause[1], []).append(clause_index)
+
+    def literal_value(self, literal):
+        value = self.values[abs(literal)]
+        if value is None:
+            return None
+        return value if literal > 0 else not value
+
+    def assign(self, literal, trail):
+        """
+        Sets literal true and propagates through the watches. Returns False on a conflict.
+        """
+        current = self.literal_value(literal)
+        if current is not None:
+            return current
+
+        self.values[abs(literal)] = literal > 0
+        trail.append(literal)
+        head = len(trail) - 1
+
+        while head < len(trail):
+            false_literal = -trail[head]
+            head += 1
+            watchers = self.watches.get(false_literal, [])
+            kept = []
+
+            for position, clause_index in enumerate(watchers):
+                clause = self.clauses[clause_index]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+
+                if self.literal_value(other) is True:
+                    kept.append(clause_index)
+                    continue
+
+                for index in range(2, len(clause)):
+                    if self.literal_value(clause[index]) is not False:
+                        clause[1], clause[index] = clause[index], clause[1]
+                        self.watches.setdefault(clause[1], []).append(clause_index)
+                        break
+                else:
+                    kept.append(clause_index)
+                    if self.literal_value(other) is False:
+                        kept.extend(watchers[position + 1:])
+                        self.watches[false_literal] = kept
+                        return False
+                    self.values[abs(other)] = other > 0
+                    trail.append(other)
+
+            self.watches[false_literal] = kept
+
+        return True
+
+    def undo(self, trail, length):
+        while len(trail) > length:
+            self.values[abs(trail.pop())] = None
+
+    def cubes(self):
+        """
+        Yields each cube as a list of 1, 0 or None (free) per variable.
+        """
+        if self.unsatisfiable:
+            return
+
+        trail = []
+        for literal in self.units:
+            if not self.assign(literal, trail):
+                return
+
+        yield from self.search(trail, 0)
+
+    def search(self, trail, first_open):
+        # Clauses before first_open are already satisfied on this branch.
+        while first_open < len(self.clauses):
+            if any(self.literal_value(literal) is True for literal in self.clauses[first_open]):
+                first_open += 1
+            else:
+                break
+
+        if first_open == len(self.clauses):
+            yield [None if value is None else int(value) for value in self.values[1:]]
+            return
+
+        branch_literal = next(literal for literal in self.clauses[first_open] if self.literal_value(literal) is None)
+        length = len(trail)
+
+        for literal in (branch_literal, -branch_literal):
+            if self.assign(literal, trail):
+                yield from self.search(trail, first_open)
+            self.undo(trail, length)
+
+
+def iter_solution_cubes(num_variables, clauses):
+    """
+    Streams all solutions as compressed cubes (see CubeEnumerator).
+    """
+    return CubeEnumerator(num_variables, clauses).cubes()
+
+
+def expand_cube(cube):
+    """
+    Yields every full assignment covered by a cube.
+    """
+    free = [index for index, value in enumerate(cube) if value is None]
+    for bits in range(2 ** len(free)):
+        row = list(cube)
+        for position, index in enumerate(free):
+            row[index] = (bits >> (len(free) - 1 - position)) & 1
+        yield row
@@ -1,36 +1,34 @@
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.cnf import load_cnf
+
+# NumPy is optional, without it the enumeration checks one assignment per Gray-code step.
+try:
+    import numpy as np
+    from shared.batch_eval import BatchEvaluator
+except ImportError:
+    np = None
+
+from dpll import count_models, iter_solution_cubes
+from partition import partitioned_count, partitioned_solutions
+
+# Number of trailing variables enumerated together as one vectorized block.
+block_bits = 12
+
 def read_cnf_file(filename):
     """
     Used to read the CNF file and extract the necessary data.
     """
-    clauses = []
-    num_variables = 0
-
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-
-                # Ignores comments, the % at the end and also the 0 at the end of the file.
-                if line.startswith('c') or line.startswith('%') or line == '0':
-                    continue
-
-                # Reads the problem line to get the number of variables stated at the beginning of the CNF file.
-                if line.startswith('p cnf'):
-                    parts = line.split()
-                    num_variables = int(parts[2])
-                    continue
-
-                # Process the clause lines by removing the 0 at the end of each line.
-                clause = list(map(int, line.split()))
-                if clause and clause[-1] == 0:
-                    clause.pop()
-                clauses.append(clause)
-    
+        cnf = load_cnf(filename)
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
-        return None, None, None
+        return None, None
 
-    return num_variables, clauses
+    return cnf.num_variables, cnf.to_lists()
 
 
 def is_clause_satisfied(clause, possibility):
@@ -56,18 +54,114 @@ def is_formula_satisfied(clauses, possibility):
     return True
 
 
-def solution_satisfier(num_variables, clauses):
+def gray_code_flips(num_bits):
     """
-    Generates all possible options of boolean values and finds satisfying ones.
+    Yields the bit that changes at each step of the binary-reflected Gray code over num_bits bits.
     """
-    possibilities = []
+    for step in range(1, 2 ** num_bits):
+        yield (step & -step).bit_length() - 1
 
-    for i in range(2 ** num_variables):
-        row = [(i >> j) & 1 for j in range(num_variables-1, -1, -1)]
-        possibilities.append(row)
 
-    satisfying_possibilities = [possibility for possibility in possibilities if is_formula_satisfied(clauses, possibility)]
-    return satisfying_possibilities
+def satisfying_blocks(num_variables, clauses, block_bits=block_bits):
+    """
+    Walks the assignment space in blocks and yields, for each block that contains solutions,
+    the values of the leading variables and a 0/1 array flagging which rows of the trailing
+    block satisfy the formula (None when the block is a single row).
+    The leading variables are walked in Gray-code order, so each step flips one variable and
+    only the clauses that contain it are updated.
+    """
+    if np is None:
+        block_bits = 0
+    block_bits = min(block_bits, num_variables)
+    num_high = num_variables - block_bits
+
+    # Clause state from the leading variables only: true-literal counts and how many clauses are still open.
+    high_counts = [0] * len(clauses)
+    high_occurrences = [[] for _ in range(num_high)]
+    has_low_literal = [any(abs(literal) > num_high for literal in clause) for clause in clauses]
+    high_possibility = [0] * num_high
+
+    for clause_index, clause in enumerate(clauses):
+        for literal in clause:
+            var = abs(literal) - 1
+            if var < num_high:
+                high_occurrences[var].append((clause_index, 1 if literal > 0 else 0))
+                if literal < 0:
+                    high_counts[clause_index] += 1
+
+    open_clauses = [count == 0 for count in high_counts]
+    blocked = sum(1 for clause_index in range(len(clauses)) if open_clauses[clause_index] and not has_low_literal[clause_index])
+
+    if block_bits:
+        # Which rows of the trailing block satisfy each clause, packed 8 rows per byte.
+        low_rows = np.array([[(row >> (block_bits - 1 - j)) & 1 for j in range(block_bits)] for row in range(2 ** block_bits)], dtype=np.uint8)
+        low_clauses = [[(abs(literal) - num_high) * (1 if literal > 0 else -1) for literal in clause if abs(literal) > num_high] for clause in clauses]
+        low_satisfied = np.packbits(BatchEvaluator(low_clauses).clause_mask(low_rows).T, axis=1)
+        open_mask = np.array(open_clauses, dtype=bool)
+
+    flips = gray_code_flips(num_high)
+    while True:
+        if not blocked:
+            if not block_bits:
+                if not any(open_clauses):
+                    yield high_possibility, None
+            else:
+                rows = np.bitwise_and.reduce(low_satisfied[open_mask], axis=0) if open_mask.any() else np.full(low_satisfied.shape[1], 255, dtype=np.uint8)
+                if rows.any():
+                    yield high_possibility, np.unpackbits(rows, count=2 ** block_bits)
+
+        var = next(flips, None)
+        if var is None:
+            break
+
+        value = high_possibility[var]
+        for clause_index, sign in high_occurrences[var]:
+            if sign == value:
+                high_counts[clause_index] -= 1
+                now_open = high_counts[clause_index] == 0
+            else:
+                high_counts[clause_index] += 1
+                now_open = False
+                if high_counts[clause_index] != 1:
+                    continue
+            if open_clauses[clause_index] != now_open:
+                open_clauses[clause_index] = now_open
+                if block_bits:
+                    open_mask[clause_index] = now_open
+                if not has_low_literal[clause_index]:
+                    blocked += 1 if now_open else -1
+        high_possibility[var] = 1 - value
+
+
+def iter_satisfying_possibilities(num_variables, clauses, block_bits=block_bits):
+    """
+    Lazily yields every satisfying assignment (as a list of 0s and 1s) without building the whole search space.
+    """
+    for high_possibility, rows in satisfying_blocks(num_variables, clauses, block_bits):
+        if rows is None:
+            yield high_possibility[:]
+            continue
+
+        low_bits = num_variables - len(high_possibility)
+        for row in np.flatnonzero(rows).tolist():
+            yield high_possibility + [(row >> (low_bits - 1 - j)) & 1 for j in range(low_bits)]
+
+
+def count_satisfying_possibilities(num_variables, clauses, block_bits=block_bits):
+    """
+    Counts the satisfying assignments in constant memory, no assignment is ever stored.
+    """
+    total = 0
+    for _, rows in satisfying_blocks(num_variables, clauses, block_bits):
+        total += 1 if rows is None else int(rows.sum())
+    return total
+
+
+def solution_satisfier(num_variables, clauses):
+    """
+    Finds all satisfying assignments, in the same order as counting up in binary.
+    """
+    return sorted(iter_satisfying_possibilities(num_variables, clauses))
 
 
 def convert_to_boolean(assignment):
@@ -77,20 +171,49 @@ def convert_to_boolean(assignment):
     return [False if val == 0 else True for val in assignment]
 
 
+def convert_cube_to_boolean(cube):
+    """
+    Same as convert_to_boolean, but free variables of a cube are kept as None.
+    """
+    return [None if val is None else bool(val) for val in cube]
+
+
 def main():
-    filename = input('Enter file name: ')
-    num_variables, clauses = read_cnf_file(filename)
-    
-    # Will exit if the file is not found.
-    if num_variables is None or clauses is None:
-        return
-
-    results = solution_satisfier(num_variables, clauses)
-
-    print(f"Number of satisfying solutions: {len(results)}")
-    for result in results:
-        boolean_result = convert_to_boolean(result)
-        print(boolean_result)
+    print("Chose one of the options below to execute:")
+    option = input("A - List all satisfying solutions\nB - Count satisfying solutions only\nC - Count solutions with DPLL and list them as cubes (None = either value)\nD - List all satisfying solutions with a pruned search on every core\nE - Count satisfying solutions with a pruned search on every core\n")
+
+    if re.match("^[ABCDE]$", option):
+        filename = input('Enter file name: ')
+        num_variables, clauses = read_cnf_file(filename)
+
+        # Will exit if the file is not found.
+        if num_variables is None or clauses is None:
+            return
+
+        if option == 'A':
+            num_results = 0
+            for result in iter_satisfying_possibilities(num_variables, clauses):
+                num_results += 1
+                print(convert_to_boolean(result))
+            print(f"Number of satisfying solutions: {num_results}")
+
+        elif option == 'B':
+            print(f"Number of satisfying solutions: {count_satisfying_possibilities(num_variables, clauses)}")
+
+        elif option == 'C':
+            print(f"Number of satisfying solutions: {count_models(num_variables, clauses)}")
+            for cube in iter_solution_cubes(num_variables, clauses):
+                print(convert_cube_to_boolean(cube))
+
+        elif option == 'D':
+            num_results = 0
+            for result in partitioned_solutions(num_variables, clauses):
+                num_results += 1
+                print(convert_to_boolean(result))
+            print(f"Number of satisfying solutions: {num_results}")
+
+        elif option == 'E':
+            print(f"Number of satisfying solutions: {partitioned_count(num_variables, clauses)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+import multiprocessing
+import signal
+
+# Without an explicit prefix length, the space is split into about this many subspaces per process,
+# so a process that drew a cheap subspace picks up another one instead of waiting.
+subspaces_per_process = 16
+
+# Set in every worker by init_worker: number of variables, clause checks per variable and whether to collect solutions.
+_worker_state = None
+
+
+def clause_checks(num_variables, clauses):
+    """
+    Groups the clauses by their highest variable (0-based). A clause is falsified exactly when all its
+    variables are assigned and none of its literals is true, so it only has to be checked once the depth-first
+    search has assigned its highest variable. Each clause becomes a list of (variable, value that makes it true).
+    Returns None if the formula has an empty clause.
+    """
+    checks = [[] for _ in range(num_variables)]
+    for clause in clauses:
+        if not clause:
+            return None
+        literals = [(abs(literal) - 1, 1 if literal > 0 else 0) for literal in clause]
+        checks[max(var for var, _ in literals)].append(literals)
+    return checks
+
+
+def default_prefix_bits(num_variables, processes):
+    return min(num_variables, max(1, (processes * subspaces_per_process - 1).bit_length()))
+
+
+def init_worker(num_variables, checks, collect):
+    global _worker_state
+    _worker_state = (num_variables, checks, collect)
+    # Only the parent handles Ctrl-C, leaving the pool terminates the workers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def search_subspace(prefix, num_variables, checks, collect):
+    """
+    Depth-first search of the assignments that start with prefix (the values of the first variables),
+    trying 0 before 1 so the solutions come out in the same order as counting up in binary.
+    A branch is cut as soon as the partial assignment falsifies a clause. When only counting, a branch
+    with no clause left to check adds all its completions at once.
+    Returns the number of solutions and the list of them (None unless collect is set).
+    """
+    assignment = list(prefix) + [0] * (num_variables - len(prefix))
+    for depth in range(len(prefix)):
+        for clause in checks[depth]:
+            if not any(assignment[var] == value for var, value in clause):
+                return 0, [] if collect else None
+
+    # unconstrained_from[depth] is true when no clause has its highest variable at depth or later.
+    unconstrained_from = [False] * (num_variables + 1)
+    unconstrained_from[num_variables] = True
+    for depth in range(num_variables - 1, -1, -1):
+        unconstrained_from[depth] = unconstrained_from[depth + 1] and not checks[depth]
+
+    solutions = [] if collect else None
+    count = 0
+
+    def extend(depth):
+        nonlocal count
+        if depth == num_variables:
+            count += 1
+            if collect:
+                solutions.append(assignment[:])
+            return
+        if not collect and unconstrained_from[depth]:
+            count += 2 ** (num_variables - depth)
+            return
+
+        depth_checks = checks[depth]
+        for value in (0, 1):
+            assignment[depth] = value
+            for clause in depth_checks:
+                if not any(assignment[var] == literal_value for var, literal_value in clause):
+                    break
+            else:
+                extend(depth + 1)
+        assignment[depth] = 0
+
+    extend(len(prefix))
+    return count, solutions
+
+
+def run_prefix(prefix):
+    return search_subspace(prefix, *_worker_state)
+
+
+def iter_subspaces(num_variables, clauses, collect, processes=None, prefix_bits=None):
+    """
+    Splits the assignment space by fixing the first prefix_bits variables and searches the subspaces across
+    a process pool (all cores unless processes is given, in this process when it is 1).
+    Yields (count, solutions) of every subspace in prefix order, as soon as it and all the ones before it are done.
+    """
+    checks = clause_checks(num_variables, clauses)
+    if checks is None:
+        yield 0, [] if collect else None
+        return
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if prefix_bits is None:
+        prefix_bits = default_prefix_bits(num_variables, processes)
+    prefix_bits = min(prefix_bits, num_variables)
+    prefixes = ([(index >> (prefix_bits - 1 - j)) & 1 for j in range(prefix_bits)] for index in range(2 ** prefix_bits))
+
+    if processes <= 1:
+        for prefix in prefixes:
+            yield search_subspace(prefix, num_variables, checks, collect)
+        return
+
+    with multiprocessing.Pool(processes, init_worker, (num_variables, checks, collect)) as pool:
+        yield from pool.imap(run_prefix, prefixes)
+
+
+def partitioned_solutions(num_variables, clauses, processes=None, prefix_bits=None):
+    """
+    Lazily yields every satisfying assignment (as a list of 0s and 1s), in the same order as counting up in binary.
+    """
+    for _, solutions in iter_subspaces(num_variables, clauses, True, processes, prefix_bits):
+        yield from solutions
+
+
+def partitioned_count(num_variables, clauses, processes=None, prefix_bits=None):
+    """
+    Counts the satisfying assignments by merging the counts of the subspaces.
+    """
+    return sum(count for count, _ in iter_subspaces(num_variables, clauses, False, processes, prefix_bits))
@@ -1,45 +1,55 @@
-from itertools import combinations
+from itertools import islice
+from math import comb, exp, gcd
 import random
 import re
+import statistics
 import time
-import csv
 import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.assignment import Assignment
+from shared.budget import Budget, interruptible
+from shared.cnf import load_cnf
+from shared.flip_engine import FlipEvaluator, ScoredFlipEvaluator
+from shared.parallel import new_base_seed, parallel_runs, run_seed
+from shared.results import ResultsWriter
 
 max_runs = 30
 max_evaluations = 10000000
+# Wall-clock seconds per run, see shared.budget.Budget.
+max_seconds = None
+# JSON-lines file of each run's progress snapshots, {run} is replaced by the run number. None records nothing.
+progress_path = None
+
+# Focused random walk settings (options E and F).
+flips_per_restart = 100000
+walksat_noise = 0.567
+probsat_cb = 2.38
+probsat_eps = 1.0
+
+# Iterated local search settings (option G).
+ils_variable_neighbourhood = False
+ils_min_strength = 2
+# The perturbation strength grows up to this fraction of the variables while the search stagnates.
+ils_max_strength_fraction = 0.1
+# Probability that a perturbed variable is taken from a random unsatisfied clause instead of uniformly.
+ils_unsat_bias = 0.8
+ils_start_temperature = 2.0
+ils_cooling = 0.995
 
 def read_cnf_file(filename):
     """
     Used to read the CNF file and extract the necessary data.
     """
-    clauses = []
-    num_variables = 0
-    num_clauses = 0
-
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-
-                if line.startswith('c') or line.startswith('%') or line == '0':
-                    continue
-
-                if line.startswith('p cnf'):
-                    parts = line.split()
-                    num_variables = int(parts[2])
-                    num_clauses = int(parts[3])
-                    continue
-
-                clause = list(map(int, line.split()))
-                if clause and clause[-1] == 0:
-                    clause.pop()
-                clauses.append(clause)
-    
+        cnf = load_cnf(filename)
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
         return None, None, None
 
-    return num_variables, num_clauses, clauses
+    return cnf.num_variables, cnf.num_clauses, cnf
 
 def num_clauses_satisfied(clause, possibility):
     """
@@ -65,40 +75,133 @@ def clause_counter(possibility, clauses):
 
     return clauses_satisfied
 
-def hillclimb(num_variables, clauses, variable_neighbourhood):
+def unrank_combination(rank, num_variables, size):
+    """
+    Returns the k-subset (k = size) of range(num_variables) with the given rank in colexicographic order.
+    """
+    combination = []
+    upper = num_variables
+
+    for remaining in range(size, 0, -1):
+        # Largest element with comb(element, remaining) <= rank.
+        low, high = remaining - 1, upper - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if comb(middle, remaining) <= rank:
+                low = middle
+            else:
+                high = middle - 1
+        combination.append(low)
+        rank -= comb(low, remaining)
+        upper = low
+
+    return combination
+
+def random_combinations(num_variables, size):
+    """
+    Lazily yields every k-subset (k = size) of range(num_variables) once, in a pseudo-random order.
+    The ranks are walked with a random affine permutation (start + i * step mod total), so only O(k)
+    memory is used and the time spent is proportional to the neighbours actually drawn.
+    """
+    total = comb(num_variables, size)
+    if total == 0:
+        return
+
+    step = 1
+    if total > 2:
+        step = random.randrange(1, total)
+        while gcd(step, total) != 1:
+            step = random.randrange(1, total)
+    start = random.randrange(total)
+
+    for i in range(total):
+        yield unrank_combination((start + i * step) % total, num_variables, size)
+
+def hillclimb(num_variables, clauses, variable_neighbourhood, evaluator=None, instrumentation=None, budget=None, initial=None):
     """
     Implements the Hillclimbing algorithm.
-    Starts with a random assignment of variables, evaluates neighbors, and 
+    Starts with a random assignment of variables (or climbs initial in place), evaluates neighbors, and 
     continues improving until no better neighbor is found.
+    Neighbours are scored incrementally by a FlipEvaluator, which can be passed in to reuse its occurrence lists.
+    The assignment is a shared.assignment.Assignment changed in place, so moves never copy it. At Hamming
+    distance 1 the variables are tried in a lazily shuffled order, without allocating per neighbour. At distance
+    2 and 3 each neighbour still costs a small list of indexes and a dict of clause changes.
+    An optional shared.budget.Budget is charged one evaluation per neighbour, the climb stops early when it runs out.
+    An evaluator already tracking initial (changed only through the evaluator since) is not reset.
     """
-    current_possibility = [random.choice([0,1]) for _ in range(num_variables)]
+    timed = instrumentation is not None
+    if timed:
+        last = perf_counter()
+
+    current_possibility = Assignment.random(num_variables) if initial is None else initial
+    if evaluator is None:
+        evaluator = FlipEvaluator(num_variables, clauses)
+    if evaluator.possibility is not current_possibility.bits:
+        evaluator.reset(current_possibility.bits)
     function_evaluations = 0
-    satisfied_clauses = clause_counter(current_possibility, clauses)
+    accepted_moves = 0
+    satisfied_clauses = evaluator.satisfied
     max_hamming_distance = 3 if variable_neighbourhood else 1
     hamming_distance = 1
+    order = list(range(num_variables))
+
+    if timed:
+        now = perf_counter()
+        instrumentation.add_time('init', now - last)
+        last = now
 
     while True:
         improved = False
 
         for hamming_distance in range(1, max_hamming_distance + 1):
-            order = list(range(num_variables))
-            random.shuffle(order)
-            all_combinations = list(combinations(order, hamming_distance))
-            random.shuffle(all_combinations)
-
-            for indexes in random.sample(list(combinations(order, hamming_distance)), len(order)):
-                neighbour_possibility = current_possibility.copy()
-
-                for index in indexes:
-                    neighbour_possibility[index] = 1 - current_possibility[index]
-                
-                neighbour_clauses = clause_counter(neighbour_possibility, clauses)
+            # Up to num_variables distinct neighbours are tried at each distance.
+            if hamming_distance > 1:
+                combinations = islice(random_combinations(num_variables, hamming_distance), num_variables)
+
+            for position in range(num_variables):
+                if hamming_distance == 1:
+                    # One Fisher-Yates step, so every sweep tries the variables in a fresh random order.
+                    swap = random.randrange(position, num_variables)
+                    order[position], order[swap] = order[swap], order[position]
+                    var = order[position]
+                else:
+                    indexes = next(combinations, None)
+                    if indexes is None:
+                        break
+
+                if budget is not None:
+                    if budget.exhausted():
+                        break
+                    budget.spend()
+
+                if timed:
+                    now = perf_counter()
+                    instrumentation.add_time('neighbourhood', now - last)
+                    last = now
+
+                if hamming_distance == 1:
+                    neighbour_clauses = satisfied_clauses + evaluator.flip_delta(var)
+                else:
+                    neighbour_clauses = satisfied_clauses + evaluator.flips_delta(indexes)
                 function_evaluations +=1
 
+                if timed:
+                    now = perf_counter()
+                    instrumentation.add_time('evaluation', now - last)
+                    last = now
+
                 if neighbour_clauses > satisfied_clauses:
-                    current_possibility = neighbour_possibility
+                    if hamming_distance == 1:
+                        evaluator.flip(var)
+                    else:
+                        evaluator.flip_all(indexes)
                     satisfied_clauses = neighbour_clauses
+                    accepted_moves += 1
                     improved = True
+                    if timed:
+                        now = perf_counter()
+                        instrumentation.add_time('bookkeeping', now - last)
+                        last = now
                     break
 
             if improved:
@@ -107,6 +210,12 @@ def hillclimb(num_variables, clauses, variable_neighbourhood):
         if not improved:
             break
 
+    if timed:
+        instrumentation.count('evaluations', function_evaluations)
+        instrumentation.count('accepted_moves', accepted_moves)
+        instrumentation.count('restarts')
+        instrumentation.progress(satisfied_clauses, current_possibility.copy())
+
     return current_possibility, satisfied_clauses, function_evaluations
 
 def convert_to_boolean(assignment):
@@ -115,17 +224,22 @@ def convert_to_boolean(assignment):
     """
     return [bool(val) for val in assignment]
 
-def neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart):
+def neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart, evaluator=None, instrumentation=None, budget=None):
     """
     Runs the hillclimb algorithm multiple times and tracks the best result across the runs.
+    The climbs share one budget (max_evaluations and max_seconds unless one is passed in) and stop when it runs out.
     """
     best_clauses = 0
     best_function_evaluations = 0
     best_solution = []
     max_runs = 1 if multistart else 30
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
 
     for _ in range(max_runs):
-        current_solution, satisfied_clauses, function_evaluations= hillclimb(num_variables, clauses, variable_neighbourhood)
+        if budget.exhausted():
+            break
+        current_solution, satisfied_clauses, function_evaluations= hillclimb(num_variables, clauses, variable_neighbourhood, evaluator, instrumentation, budget)
         
         if satisfied_clauses > best_clauses:
             best_clauses = satisfied_clauses
@@ -134,47 +248,280 @@ def neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multis
 
     return best_solution, best_clauses, best_function_evaluations
 
-def multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename):
+def multistart_run(run_num, num_variables, num_clauses, clauses, variable_neighbourhood, multistart, instrumentation=None, budget=None):
     """
-    Runs the multistart hillclimb algorithm multiple times (30 times, max_runs) and tracks the best result across the runs.
+    One multistart run: restarts the hillclimb until the formula is solved or the budget
+    (max_evaluations and max_seconds unless one is passed in) is used up or stopped.
     """
-    subdirectory = "revised"
-    filepath = os.path.join(subdirectory, csv_filename)
+    current_best_solution = []
+    current_best_satisfied_clauses = 0
+    run_start_time = time.time()
+    evaluator = FlipEvaluator(num_variables, clauses)
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+
+    while not budget.exhausted():
+        current_solution, current_satisfied_clauses, current_function_evaluations = neighbourhood_checker(
+            num_variables, clauses, variable_neighbourhood, multistart, evaluator, instrumentation, budget)
+
+        if current_satisfied_clauses > current_best_satisfied_clauses:
+            current_best_satisfied_clauses = current_satisfied_clauses
+            current_best_solution = current_solution
+
+        if current_satisfied_clauses == num_clauses:
+            budget.solved()
+            break
 
-    for run_num in range(max_runs):
-        function_counter = 0
-        current_best_solution = []
-        current_best_satisfied_clauses = 0
-        run_start_time = time.time()
+    return current_best_solution, current_best_satisfied_clauses, budget.evaluations, time.time() - run_start_time
 
-        while function_counter <= max_evaluations:
-            current_solution, current_satisfied_clauses, current_function_evaluations = neighbourhood_checker(
-                num_variables, clauses, variable_neighbourhood, multistart)
+def perturbation(evaluator, strength):
+    """
+    Picks strength distinct variables to flip, each one from a random unsatisfied clause with probability
+    ils_unsat_bias and uniformly otherwise, so the kick mostly lands where the local optimum is stuck.
+    """
+    unsatisfied = [clause_index for clause_index, count in enumerate(evaluator.true_counts) if count == 0]
+    variables = set()
+
+    while len(variables) < strength:
+        if unsatisfied and random.random() < ils_unsat_bias:
+            clause = evaluator.clauses[random.choice(unsatisfied)]
+            variables.add(abs(random.choice(clause)) - 1)
+        else:
+            variables.add(random.randrange(evaluator.num_variables))
+
+    return sorted(variables)
+
+def iterated_local_search(num_variables, clauses, variable_neighbourhood, acceptance='better', instrumentation=None, budget=None):
+    """
+    Iterated local search: climbs once from a random assignment, then repeatedly perturbs the current local optimum
+    by flipping k variables (see perturbation) and climbs again from there instead of from a fresh random assignment.
+    The new optimum replaces the current one if it is better ('better'), at least as good ('equal'), or otherwise
+    with probability exp(difference / temperature) ('annealing', the temperature cools by ils_cooling every climb).
+    A rejected optimum is undone by flipping back only the variables that differ from the current one.
+    k goes back to ils_min_strength after an improvement and grows by one after every climb that does not improve,
+    up to ils_max_strength_fraction of the variables.
+    Stops when every clause is satisfied or the budget (max_evaluations and max_seconds unless one is passed in) runs out.
+    Returns the best assignment, its satisfied clauses and the climb statistics.
+    """
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+    num_clauses = len(clauses)
+    evaluator = FlipEvaluator(num_variables, clauses)
+    max_strength = max(ils_min_strength, int(num_variables * ils_max_strength_fraction))
+    strength = ils_min_strength
+    temperature = ils_start_temperature
+
+    current_possibility, current_satisfied, function_evaluations = hillclimb(num_variables, clauses, variable_neighbourhood, evaluator, instrumentation, budget)
+    stats = {'climbs': 1, 'first_climb_evaluations': function_evaluations, 'reclimbs': 0, 'reclimb_evaluations': 0}
+    home_possibility = current_possibility.copy()
+    home_satisfied = current_satisfied
+    best_possibility = current_possibility.copy()
+    best_satisfied = current_satisfied
+
+    while best_satisfied < num_clauses and not budget.exhausted():
+        evaluator.flip_all(perturbation(evaluator, min(strength, num_variables)))
+        _, current_satisfied, function_evaluations = hillclimb(num_variables, clauses, variable_neighbourhood, evaluator, instrumentation, budget, current_possibility)
+        stats['reclimbs'] += 1
+        stats['reclimb_evaluations'] += function_evaluations
+        if instrumentation is not None:
+            instrumentation.count('perturbations')
+
+        if current_satisfied > best_satisfied:
+            best_satisfied = current_satisfied
+            best_possibility.copy_from(current_possibility)
+
+        difference = current_satisfied - home_satisfied
+        strength = ils_min_strength if difference > 0 else min(strength + 1, max_strength)
+        if acceptance == 'annealing':
+            accepted = difference >= 0 or random.random() < exp(difference / temperature)
+            temperature *= ils_cooling
+        elif acceptance == 'equal':
+            accepted = difference >= 0
+        else:
+            accepted = difference > 0
+
+        if accepted:
+            home_possibility.copy_from(current_possibility)
+            home_satisfied = current_satisfied
+        else:
+            evaluator.flip_all(current_possibility.differences(home_possibility))
+
+    stats['climbs'] += stats['reclimbs']
+    return best_possibility, best_satisfied, stats
+
+def ils_run(run_num, num_variables, num_clauses, clauses, variable_neighbourhood, acceptance, instrumentation=None, budget=None):
+    """
+    One iterated local search run, also returning its climb statistics after the usual four run results.
+    """
+    run_start_time = time.time()
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+
+    best_solution, best_satisfied_clauses, stats = iterated_local_search(num_variables, clauses, variable_neighbourhood, acceptance, instrumentation, budget)
+    if best_satisfied_clauses == num_clauses:
+        budget.solved()
 
-            if current_satisfied_clauses > current_best_satisfied_clauses:
-                current_best_satisfied_clauses = current_satisfied_clauses
-                current_best_solution = current_solution
+    return best_solution, best_satisfied_clauses, budget.evaluations, time.time() - run_start_time, stats
+
+def focused_walk(num_variables, clauses, max_flips, algorithm='walksat', instrumentation=None, budget=None):
+    """
+    Focused random walk from a random assignment: every step picks a random unsatisfied clause and flips
+    one of its variables, so variables outside broken clauses are never considered.
+    'walksat' flips a variable that breaks nothing if there is one, otherwise a random variable of the clause
+    with probability walksat_noise, or else the one with the fewest breaks.
+    'probsat' picks the variable with probability proportional to (probsat_eps + break) ** -probsat_cb.
+    Each flip counts as one function evaluation. Stops when every clause is satisfied, after max_flips flips
+    or when the optional shared.budget.Budget runs out.
+    """
+    current_possibility = Assignment.random(num_variables)
+    evaluator = ScoredFlipEvaluator(num_variables, clauses, current_possibility.bits)
+    # The evaluator's own clause lists, so a CNF is not sliced every step.
+    clauses = evaluator.clauses
+    unsatisfied = evaluator.unsatisfied
+    break_ = evaluator.break_
+    best_possibility = current_possibility.copy()
+    best_satisfied_clauses = evaluator.satisfied
+    function_evaluations = 0
 
-            function_counter += current_function_evaluations
+    # ProbSAT weights for every break count a variable can have.
+    max_occurrences = max((len(occurrences) for occurrences in evaluator.occurrences), default=0)
+    probsat_weights = [(probsat_eps + breaks) ** -probsat_cb for breaks in range(max_occurrences + 1)]
 
-            if current_satisfied_clauses == num_clauses or function_counter >= max_evaluations:
+    while unsatisfied and function_evaluations < max_flips:
+        if budget is not None:
+            if budget.exhausted():
                 break
+            budget.spend()
+
+        clause = clauses[unsatisfied[random.randrange(len(unsatisfied))]]
+        variables = [abs(literal) - 1 for literal in clause]
+
+        if algorithm == 'probsat':
+            var = random.choices(variables, weights=[probsat_weights[break_[v]] for v in variables])[0]
+        else:
+            breaks = [break_[v] for v in variables]
+            lowest = min(breaks)
+            if lowest > 0 and random.random() < walksat_noise:
+                var = random.choice(variables)
+            else:
+                var = random.choice([v for v, breaks_v in zip(variables, breaks) if breaks_v == lowest])
 
-        with open(filepath, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            boolean_result = convert_to_boolean(current_best_solution)
-            writer.writerow(' ')
-            writer.writerow([f'Solution number {run_num + 1}'])
-            writer.writerow([str(boolean_result)])
-            writer.writerow(['Clauses Satisfied', 'Function Evaluations', 'Time (seconds)'])
-            writer.writerow([current_best_satisfied_clauses, function_counter, time.time() - run_start_time])
+        evaluator.flip(var)
+        function_evaluations += 1
+
+        if evaluator.satisfied > best_satisfied_clauses:
+            best_satisfied_clauses = evaluator.satisfied
+            best_possibility.copy_from(current_possibility)
+
+    if instrumentation is not None:
+        instrumentation.count('evaluations', function_evaluations)
+        instrumentation.count('accepted_moves', function_evaluations)
+        instrumentation.count('restarts')
+        instrumentation.progress(best_satisfied_clauses, best_possibility)
+
+    return best_possibility, best_satisfied_clauses, function_evaluations
+
+def focused_run(run_num, num_variables, num_clauses, clauses, algorithm, instrumentation=None, budget=None):
+    """
+    One focused-walk run: restarts the walk every flips_per_restart flips until the formula is solved or the budget
+    (max_evaluations and max_seconds unless one is passed in) is used up or stopped.
+    """
+    current_best_solution = []
+    current_best_satisfied_clauses = 0
+    run_start_time = time.time()
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+
+    while not budget.exhausted():
+        current_solution, current_satisfied_clauses, current_function_evaluations = focused_walk(
+            num_variables, clauses, flips_per_restart, algorithm, instrumentation, budget)
+
+        if current_satisfied_clauses > current_best_satisfied_clauses:
+            current_best_satisfied_clauses = current_satisfied_clauses
+            current_best_solution = current_solution
+
+        if current_satisfied_clauses == num_clauses:
+            budget.solved()
+            break
+
+    return current_best_solution, current_best_satisfied_clauses, budget.evaluations, time.time() - run_start_time
+
+def run_experiment(run_function, args, algorithm, csv_filename, seed=None, processes=None, instance='', cancel_on_solve=False):
+    """
+    Runs run_function(run_num, *args) max_runs times with shared.parallel.parallel_runs and appends one row
+    per run (shared.results schema) to the CSV file in the results folder. The revised folder keeps
+    the files of the older layout, which the results schema cannot be appended to.
+    Returns the results of the runs in order, None for the runs that never started.
+    """
+    subdirectory = "results"
+    filepath = os.path.join(subdirectory, csv_filename)
+    if seed is None:
+        seed = new_base_seed()
+    print(f"Seed: {seed}")
+
+    runs = parallel_runs(run_function, max_runs, args, seed, processes, cancel_on_solve, progress_path)
+    results = []
+
+    with ResultsWriter(filepath) as writer:
+        for run_num, result in enumerate(runs):
+            results.append(result)
+            if result is None:
+                print(f"Run {run_num + 1} cancelled.")
+                continue
+            current_best_solution, current_best_satisfied_clauses, function_counter, run_time = result[:4]
+            writer.write(instance, algorithm, run_seed(seed, run_num), run_num + 1, current_best_satisfied_clauses, function_counter, run_time, current_best_solution)
             print(f"Run {run_num + 1} completed.")
 
+    return results
+
+def run_length_summary(results, num_clauses):
+    """
+    Prints the run-length distribution: how many runs solved the formula and how many evaluations they took.
+    """
+    finished = [result for result in results if result is not None]
+    lengths = sorted(result[2] for result in finished if result[1] == num_clauses)
+    print(f"Solved {len(lengths)}/{len(finished)} runs.")
+    if lengths:
+        print(f"Evaluations to solution: min {lengths[0]}, median {statistics.median(lengths):g}, "
+              f"mean {statistics.mean(lengths):.0f}, max {lengths[-1]}")
+
+def multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename, seed=None, processes=None, instance='', cancel_on_solve=False):
+    """
+    Runs the multistart hillclimb algorithm multiple times (30 times, max_runs) and tracks the best result across the runs.
+    Every run is appended to the CSV file as one row of the shared.results schema.
+    """
+    algorithm = 'multistart_vna' if variable_neighbourhood else 'multistart_next_ascent'
+    results = run_experiment(multistart_run, (num_variables, num_clauses, clauses, variable_neighbourhood, multistart), algorithm, csv_filename, seed, processes, instance, cancel_on_solve)
+    run_length_summary(results, num_clauses)
+
+def iterated_local_search_checker(num_variables, num_clauses, clauses, variable_neighbourhood, acceptance, csv_filename, seed=None, processes=None, instance='', cancel_on_solve=False):
+    """
+    Runs the iterated local search max_runs times like multistart_neighbourhood_checker, then prints the run-length
+    distribution and how many evaluations re-climbing from a perturbed optimum saved against climbing from a random assignment.
+    """
+    algorithm = f"ils_{acceptance}_vna" if variable_neighbourhood else f"ils_{acceptance}"
+    results = run_experiment(ils_run, (num_variables, num_clauses, clauses, variable_neighbourhood, acceptance), algorithm, csv_filename, seed, processes, instance, cancel_on_solve)
+    run_length_summary(results, num_clauses)
+
+    finished = [result for result in results if result is not None]
+    stats = [result[4] for result in finished]
+    reclimbs = sum(run_stats['reclimbs'] for run_stats in stats)
+    if not reclimbs:
+        return
+    first_climb = statistics.mean(run_stats['first_climb_evaluations'] for run_stats in stats)
+    reclimb = sum(run_stats['reclimb_evaluations'] for run_stats in stats) / reclimbs
+    print(f"Climbs per run: {statistics.mean(run_stats['climbs'] for run_stats in stats):.0f}, "
+          f"evaluations per climb: {first_climb:.0f} from a random assignment, {reclimb:.0f} after a perturbation")
+    solved = [result[4] for result in finished if result[1] == num_clauses]
+    if solved:
+        saved = statistics.mean(run_stats['reclimbs'] for run_stats in solved) * (first_climb - reclimb)
+        print(f"Evaluations saved per solved run against restarting every climb: {saved:.0f}")
+
 def main():
     print("Chose one of the algorithms below to execute:")
-    option = input("A - Next Ascent Hillclimbing\nB - Multistart Next Ascent Hillclimbing\nC - Variable Neighbourhood Ascent\nD - Multistart Variable Neighbourhood Ascent\n")
+    option = input("A - Next Ascent Hillclimbing\nB - Multistart Next Ascent Hillclimbing\nC - Variable Neighbourhood Ascent\nD - Multistart Variable Neighbourhood Ascent\nE - WalkSAT\nF - ProbSAT\nG - Iterated Local Search\n")
 
-    if re.match("^[ABCD]$", option):
+    if re.match("^[ABCDEFG]$", option):
         filename = input('Enter file name: \n')
         num_variables, num_clauses, clauses = read_cnf_file(filename)
         if num_variables is None or clauses is None:
@@ -184,28 +531,52 @@ def main():
             variable_neighbourhood = False
             multistart = False
             csv_filename = 'results_A_Next_Ascent_Hillclimbing.csv'
-            neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart)
+            with interruptible():
+                neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart)
             
         elif option == 'B':
             print("Running...")
             variable_neighbourhood = False
             multistart = True
             csv_filename = 'results_B_Multistart_Next_Ascent_Hillclimbing.csv'
-            multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename)
+            multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename, instance=os.path.basename(filename))
             print("Finished.")
 
         elif option == 'C':
             variable_neighbourhood = True
             multistart = False
             csv_filename = 'results_C_Variable_Neighbourhood_Ascent.csv'
-            neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart)
+            with interruptible():
+                neighbourhood_checker(num_variables, clauses, variable_neighbourhood, multistart)
             
         elif option == 'D':
             print("Running...")
             variable_neighbourhood = True
             multistart = True
             csv_filename = 'results_D_Multistart_Variable_Neighbourhood_Ascent.csv'
-            multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename)
+            multistart_neighbourhood_checker(num_variables, num_clauses, clauses, variable_neighbourhood, multistart, csv_filename, instance=os.path.basename(filename))
+            print("Finished.")
+
+        elif option == 'E':
+            print("Running...")
+            csv_filename = 'results_E_WalkSAT.csv'
+            run_experiment(focused_run, (num_variables, num_clauses, clauses, 'walksat'), 'walksat', csv_filename, instance=os.path.basename(filename))
+            print("Finished.")
+
+        elif option == 'F':
+            print("Running...")
+            csv_filename = 'results_F_ProbSAT.csv'
+            run_experiment(focused_run, (num_variables, num_clauses, clauses, 'probsat'), 'probsat', csv_filename, instance=os.path.basename(filename))
+            print("Finished.")
+
+        elif option == 'G':
+            criterion = input("Chose the acceptance criterion:\nA - Better\nB - Equal\nC - Simulated Annealing\n")
+            if not re.match("^[ABC]$", criterion):
+                return
+            acceptance = {'A': 'better', 'B': 'equal', 'C': 'annealing'}[criterion]
+            print("Running...")
+            csv_filename = f'results_G_Iterated_Local_Search_{acceptance}.csv'
+            iterated_local_search_checker(num_variables, num_clauses, clauses, ils_variable_neighbourhood, acceptance, csv_filename, instance=os.path.basename(filename))
             print("Finished.")
 
 
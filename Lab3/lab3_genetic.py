@@ -1,46 +1,53 @@
 from itertools import combinations
+import multiprocessing
+import os
+import queue
 import random
+import re
+import signal
+import sys
 import time
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.assignment import Assignment
+from shared.budget import Budget, interruptible, stop_requested
+from shared.cnf import load_cnf
+from shared.fitness_cache import FitnessCache
+
+# NumPy is optional, without it the vectorized GA is unavailable and genetic_algorithm works without BatchEvaluator.
+try:
+    import numpy as np
+    from shared.batch_eval import BatchEvaluator
+except ImportError:
+    np = None
+    BatchEvaluator = None
+
+from shared.parallel import new_base_seed, run_seed
 
 max_runs = 30
+# Wall-clock limit of one run in seconds, None for no limit. The GAs also stop after num_generations.
+max_seconds = None
+# Entries of the fitness cache genetic_algorithm builds when NumPy is missing, 0 scores every population from scratch.
+# With NumPy, BatchEvaluator scores whole populations faster than the cache.
+fitness_cache_size = 1024
+# How often, in seconds, the island model checks whether an island process died without reporting.
+island_poll_seconds = 1.0
 
 def read_cnf_file(filename):
     """
     Used to read the CNF file and extract the necessary data.
     """
-    clauses = []
-    num_variables = 0
-    num_clauses = 0
-
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-
-                # Ignores comments, the % at the end and also the 0 at the end of the file.
-                if line.startswith('c') or line.startswith('%') or line == '0':
-                    continue
-
-                # Reads the problem line to get the number of variables stated at the beginning of the CNF file.
-                if line.startswith('p cnf'):
-                    parts = line.split()
-                    num_variables = int(parts[2])
-                    num_clauses = int(parts[3])
-                    continue
-
-                # Process the clause lines by removing the 0 at the end of each line.
-                clause = list(map(int, line.split()))
-                if clause and clause[-1] == 0:
-                    clause.pop()
-                clauses.append(clause)
-    
+        cnf = load_cnf(filename)
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
-    
-    return clauses, num_variables, num_clauses
+        return None, None, None
+
+    return cnf.to_lists(), cnf.num_variables, cnf.num_clauses
 
 def initialize_population(pop_size, num_variables):
-    return [[random.choice([True, False]) for _ in range(num_variables)] for _ in range(pop_size)]
+    return [Assignment.random(num_variables, (1, 0)) for _ in range(pop_size)]
 
 def fitness(solution, clauses):
     score = 0
@@ -49,54 +56,379 @@ def fitness(solution, clauses):
             score += 1
     return score
 
+def population_fitness(population, clauses, batch_evaluator=None, fitness_cache=None, lineage=None):
+    """
+    Scores a population. With a FitnessCache, repeated individuals are looked up and the others are scored
+    as a delta from one of their parents (lineage[i] holds the parents of population[i]).
+    """
+    if fitness_cache is not None:
+        if lineage is None:
+            lineage = [()] * len(population)
+        return [fitness_cache.fitness(solution, parents) for solution, parents in zip(population, lineage)]
+    if batch_evaluator is not None:
+        if population and isinstance(population[0], Assignment):
+            population = np.frombuffer(b''.join(solution.bits for solution in population), dtype=np.uint8).reshape(len(population), -1)
+        return batch_evaluator.score(population).tolist()
+    return [fitness(solution, clauses) for solution in population]
+
 def select_parents(population, fitnesses, num_parents):
     parents = random.choices(population, weights=fitnesses, k=num_parents)
     return parents
 
-def crossover(parent1, parent2):
+def crossover(parent1, parent2, child1=None, child2=None):
+    """
+    One-point crossover of two Assignments. The children are written in place into child1 and child2
+    when they are given (individuals of an old generation being reused), otherwise new ones are made.
+    """
     point = random.randint(1, len(parent1) - 1)
-    child1 = parent1[:point] + parent2[point:]
-    child2 = parent2[:point] + parent1[point:]
+    if child1 is None:
+        child1 = Assignment.zeros(len(parent1))
+        child2 = Assignment.zeros(len(parent2))
+    bits1 = memoryview(parent1.bits)
+    bits2 = memoryview(parent2.bits)
+    child1.bits[:point] = bits1[:point]
+    child1.bits[point:] = bits2[point:]
+    child2.bits[:point] = bits2[:point]
+    child2.bits[point:] = bits1[point:]
     return child1, child2
 
 def mutate(solution, mutation_rate):
     for i in range(len(solution)):
         if random.random() < mutation_rate:
-            solution[i] = not solution[i]
+            solution.flip(i)
 
-def genetic_algorithm(clauses, num_variables, pop_size=100, num_generations=1000, mutation_rate=0.01):
+def genetic_algorithm(clauses, num_variables, pop_size=100, num_generations=1000, mutation_rate=0.01, instrumentation=None, budget=None, fitness_cache=None):
+    """
+    Fitness-proportional GA over Assignments. Stops after num_generations, when an individual satisfies
+    every clause or when the budget (max_seconds unless a shared.budget.Budget is passed in, charged one
+    evaluation per individual) runs out or is stopped, and returns the best individual seen.
+    Populations are scored by BatchEvaluator, or without NumPy through a FitnessCache of fitness_cache_size
+    entries that scores children as deltas from their parents. A FitnessCache passed in is always used, and its
+    stats() can be read afterwards.
+    The populations are double-buffered: each generation's children are written over the individuals of
+    the generation before, so breeding allocates no new individuals.
+    """
+    timed = instrumentation is not None
+    if timed:
+        last = perf_counter()
+    if budget is None:
+        budget = Budget(None, max_seconds)
+    if fitness_cache is None and fitness_cache_size and BatchEvaluator is None:
+        fitness_cache = FitnessCache(num_variables, clauses, fitness_cache_size)
+    if fitness_cache is not None:
+        hits, misses = fitness_cache.hits, fitness_cache.misses
     population = initialize_population(pop_size, num_variables)
+    spare = [Assignment.zeros(num_variables) for _ in range(pop_size)]
+    lineage = None
+    batch_evaluator = BatchEvaluator(clauses) if BatchEvaluator is not None and fitness_cache is None else None
+    best_solution = None
+    best_fitness = -1
+    if timed:
+        now = perf_counter()
+        instrumentation.add_time('init', now - last)
+        last = now
     for generation in range(num_generations):
-        fitnesses = [fitness(solution, clauses) for solution in population]
-        if max(fitnesses) == len(clauses):
+        fitnesses = population_fitness(population, clauses, batch_evaluator, fitness_cache, lineage)
+        budget.spend(len(population))
+        generation_best = max(fitnesses)
+        if generation_best > best_fitness:
+            best_fitness = generation_best
+            best_solution = population[fitnesses.index(generation_best)].copy()
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('evaluation', now - last)
+            last = now
+            instrumentation.count('evaluations', len(population))
+            instrumentation.count('generations')
+            best_index = fitnesses.index(max(fitnesses))
+            instrumentation.progress(fitnesses[best_index], population[best_index].copy())
+        if generation_best == len(clauses) or budget.exhausted():
             break
         parents = select_parents(population, fitnesses, pop_size // 2)
-        next_population = []
+        next_population = spare[:len(parents)]
+        lineage = []
         for i in range(0, len(parents), 2):
             parent1, parent2 = parents[i], parents[i + 1]
-            child1, child2 = crossover(parent1, parent2)
+            child1, child2 = crossover(parent1, parent2, next_population[i], next_population[i + 1])
             mutate(child1, mutation_rate)
             mutate(child2, mutation_rate)
-            next_population.extend([child1, child2])
+            lineage.extend([(parent1, parent2), (parent2, parent1)])
+        spare = population
         population = next_population
-    best_solution = max(population, key=lambda sol: fitness(sol, clauses))
-    return best_solution, fitness(best_solution, clauses)
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('neighbourhood', now - last)
+            last = now
+    else:
+        fitnesses = population_fitness(population, clauses, batch_evaluator, fitness_cache, lineage)
+        budget.spend(len(population))
+        if max(fitnesses) > best_fitness:
+            best_fitness = max(fitnesses)
+            best_solution = population[fitnesses.index(best_fitness)].copy()
+        if timed:
+            instrumentation.add_time('evaluation', perf_counter() - last)
+            instrumentation.count('evaluations', len(population))
+    if timed:
+        if fitness_cache is not None:
+            instrumentation.count('cache_hits', fitness_cache.hits - hits)
+            instrumentation.count('cache_misses', fitness_cache.misses - misses)
+        instrumentation.progress(best_fitness, best_solution)
+    return best_solution, best_fitness
+
+def evolve_generation(population, fitnesses, rng, mutation_rate, crossover_type):
+    """
+    Breeds the next generation of a uint8 population matrix with array operations:
+    fitness-proportional selection, crossover of every pair at once and one XOR for mutation.
+    """
+    pop_size, num_variables = population.shape
+    num_pairs = (pop_size + 1) // 2
+
+    # Fitness-proportional selection of two parents per pair of children.
+    total = fitnesses.sum()
+    weights = fitnesses / total if total else None
+    parents = rng.choice(pop_size, size=2 * num_pairs, p=weights)
+    parents1 = population[parents[0::2]]
+    parents2 = population[parents[1::2]]
+
+    if crossover_type == 'uniform':
+        from_first = rng.random((num_pairs, num_variables)) < 0.5
+    else:
+        points = rng.integers(1, max(num_variables, 2), size=num_pairs)
+        from_first = np.arange(num_variables) < points[:, np.newaxis]
+
+    population = np.concatenate((np.where(from_first, parents1, parents2), np.where(from_first, parents2, parents1)))[:pop_size]
+    population ^= (rng.random(population.shape) < mutation_rate).astype(np.uint8)
+    return population
+
+def vectorized_genetic_algorithm(clauses, num_variables, pop_size=100, num_generations=1000, mutation_rate=0.01, crossover_type='one_point', instrumentation=None, budget=None):
+    """
+    Same scheme as genetic_algorithm, but the population is one uint8 matrix (individuals x variables)
+    and every step of a generation is a single array operation, including scoring the whole population at once.
+    crossover_type is 'one_point' or 'uniform'. The population keeps pop_size individuals every generation.
+    Like genetic_algorithm it honours a budget and returns the best individual seen.
+    """
+    timed = instrumentation is not None
+    if timed:
+        last = perf_counter()
+    if budget is None:
+        budget = Budget(None, max_seconds)
+
+    # Seeded from random so runs can be reproduced with random.seed().
+    rng = np.random.default_rng(random.getrandbits(64))
+    batch_evaluator = BatchEvaluator(clauses)
+    num_clauses = len(clauses)
+
+    population = rng.integers(0, 2, size=(pop_size, num_variables), dtype=np.uint8)
+    if timed:
+        now = perf_counter()
+        instrumentation.add_time('init', now - last)
+        last = now
+    fitnesses = batch_evaluator.score(population)
+    budget.spend(pop_size)
+    best_index = int(fitnesses.argmax())
+    best_solution = population[best_index].copy()
+    best_fitness = int(fitnesses[best_index])
+    if timed:
+        instrumentation.count('evaluations', pop_size)
+
+    for generation in range(num_generations):
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('evaluation', now - last)
+            last = now
+            instrumentation.count('generations')
+            best_index = int(fitnesses.argmax())
+            if instrumentation.best_clauses is None or fitnesses[best_index] > instrumentation.best_clauses:
+                instrumentation.progress(int(fitnesses[best_index]), population[best_index].tolist())
+            else:
+                instrumentation.tick()
+
+        if best_fitness == num_clauses or budget.exhausted():
+            break
+        population = evolve_generation(population, fitnesses, rng, mutation_rate, crossover_type)
+
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('neighbourhood', now - last)
+            last = now
+        fitnesses = batch_evaluator.score(population)
+        budget.spend(pop_size)
+        best_index = int(fitnesses.argmax())
+        if fitnesses[best_index] > best_fitness:
+            best_solution = population[best_index].copy()
+            best_fitness = int(fitnesses[best_index])
+        if timed:
+            instrumentation.count('evaluations', pop_size)
+
+    if timed:
+        instrumentation.add_time('evaluation', perf_counter() - last)
+        instrumentation.progress(best_fitness, best_solution.tolist())
+    return best_solution.astype(bool).tolist(), best_fitness
+
+def island_worker(island, seed, clauses, num_variables, settings, inboxes, stop_event, results):
+    """
+    Evolves one island and exchanges migrants with the others every migration_interval generations.
+    Sets stop_event when it satisfies every clause and stops as soon as any island has, when settings['max_seconds']
+    have passed or when the parent is interrupted, and reports the best individual it has seen.
+    """
+    # Only the parent handles Ctrl-C, it stops the islands through stop_event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    random.seed(seed)
+    rng = np.random.default_rng(random.getrandbits(64))
+    batch_evaluator = BatchEvaluator(clauses)
+    num_clauses = len(clauses)
+    num_islands = len(inboxes)
+
+    # Migrants left for an island that already finished must not keep this process alive.
+    for inbox in inboxes:
+        inbox.cancel_join_thread()
+
+    population = rng.integers(0, 2, size=(settings['pop_size'], num_variables), dtype=np.uint8)
+    fitnesses = batch_evaluator.score(population)
+    best_index = int(fitnesses.argmax())
+    best_solution = population[best_index].copy()
+    best_fitness = int(fitnesses[best_index])
+    deadline = perf_counter() + settings['max_seconds'] if settings['max_seconds'] is not None else None
+    generation = 0
+
+    while generation < settings['num_generations'] and not stop_event.is_set():
+        if best_fitness == num_clauses:
+            stop_event.set()
+            break
+        if deadline is not None and perf_counter() >= deadline:
+            break
+
+        population = evolve_generation(population, fitnesses, rng, settings['mutation_rate'], settings['crossover_type'])
+        fitnesses = batch_evaluator.score(population)
+        generation += 1
+        best_index = int(fitnesses.argmax())
+        if fitnesses[best_index] > best_fitness:
+            best_solution = population[best_index].copy()
+            best_fitness = int(fitnesses[best_index])
+
+        if num_islands > 1 and generation % settings['migration_interval'] == 0:
+            if settings['topology'] == 'random':
+                target = random.choice([other for other in range(num_islands) if other != island])
+            else:
+                target = (island + 1) % num_islands
+            best = np.argsort(fitnesses)[-settings['num_migrants']:]
+            inboxes[target].put((population[best].copy(), fitnesses[best].copy()))
+
+            # Incoming migrants replace the worst individuals.
+            while True:
+                try:
+                    migrants, migrant_fitnesses = inboxes[island].get_nowait()
+                except queue.Empty:
+                    break
+                worst = np.argsort(fitnesses)[:len(migrants)]
+                population[worst] = migrants
+                fitnesses[worst] = migrant_fitnesses
+
+    results.put((island, best_solution.astype(bool).tolist(), best_fitness, generation))
+
+def island_genetic_algorithm(clauses, num_variables, num_islands=None, migration_interval=10, num_migrants=2, topology='ring', pop_size=100, num_generations=1000, mutation_rate=0.01, crossover_type='one_point', seed=None, time_limit=None):
+    """
+    Island model: num_islands sub-populations (one per core by default) evolve in separate processes with
+    vectorized_genetic_algorithm's operators. Every migration_interval generations each island sends its
+    num_migrants best individuals to the next island ('ring') or to a random one ('random').
+    The whole run stops as soon as any island satisfies every clause, after time_limit seconds (max_seconds
+    if not given) or on Ctrl-C.
+    Returns the best solution, its fitness and the generations each island ran.
+    Raises RuntimeError if an island process fails.
+    """
+    if np is None:
+        raise RuntimeError("The island model needs NumPy")
+    if num_islands is None:
+        num_islands = multiprocessing.cpu_count()
+    if num_islands < 1:
+        raise ValueError("num_islands must be at least 1")
+    if migration_interval < 1:
+        raise ValueError("migration_interval must be at least 1")
+    if seed is None:
+        seed = new_base_seed()
+
+    settings = {
+        'pop_size': pop_size,
+        'num_generations': num_generations,
+        'mutation_rate': mutation_rate,
+        'crossover_type': crossover_type,
+        'migration_interval': migration_interval,
+        'num_migrants': min(num_migrants, pop_size),
+        'topology': topology,
+        'max_seconds': time_limit if time_limit is not None else max_seconds,
+    }
+    inboxes = [multiprocessing.Queue() for _ in range(num_islands)]
+    stop_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+
+    workers = [multiprocessing.Process(target=island_worker, args=(island, run_seed(seed, island), clauses, num_variables, settings, inboxes, stop_event, results))
+               for island in range(num_islands)]
+    for worker in workers:
+        worker.start()
+
+    island_results = []
+    try:
+        with interruptible(stop_event):
+            while len(island_results) < num_islands:
+                try:
+                    island_results.append(results.get(timeout=island_poll_seconds))
+                except queue.Empty:
+                    # A worker that exited cleanly has already put its result, so only a failure can leave one missing.
+                    for worker in workers:
+                        if worker.exitcode not in (None, 0):
+                            raise RuntimeError(f"Island process {worker.name} exited with code {worker.exitcode}")
+    except BaseException:
+        stop_event.set()
+        for worker in workers:
+            worker.terminate()
+        raise
+    finally:
+        for worker in workers:
+            worker.join()
+
+    island_results.sort()
+    best = max(island_results, key=lambda result: result[2])
+    return best[1], best[2], [result[3] for result in island_results]
 
 def main(): 
+    print("Chose one of the algorithms below to execute:")
+    option = input("A - Genetic Algorithm\nB - Island Genetic Algorithm (needs NumPy)\n")
+    if not re.match("^[AB]$", option):
+        return
+
     filename = input('Enter file name: \n')
     clauses, num_variables, num_clauses = read_cnf_file(filename)
 
     if num_variables is None or clauses is None:
         return
-    
-    for _ in range(max_runs):
-        start_time = time.time()
-        best_solution, best_fitness = genetic_algorithm(clauses, num_variables)
-        # best_time = time.time() - start_time
-        # boolean_result = convert_to_boolean(best_solution)
+
+    if option == 'B':
+        if np is None:
+            print("Error: The island model needs NumPy.")
+            return
+        best_solution, best_fitness, generations = island_genetic_algorithm(clauses, num_variables)
         print(f"Best solution: {best_solution}")
         print(f"Best fitness: {best_fitness}")
-        # print(f"Taking {best_time} seconds.")
+        print(f"Generations per island: {generations}")
+        return
+    
+    with interruptible():
+        for _ in range(max_runs):
+            if stop_requested():
+                break
+            start_time = time.time()
+            if np is not None:
+                best_solution, best_fitness = vectorized_genetic_algorithm(clauses, num_variables)
+            else:
+                fitness_cache = FitnessCache(num_variables, clauses, fitness_cache_size)
+                best_solution, best_fitness = genetic_algorithm(clauses, num_variables, fitness_cache=fitness_cache)
+                stats = fitness_cache.stats()
+                print(f"Fitness cache: {stats['hits']} hits, {stats['misses']} misses ({stats['delta_evaluations']} scored as parent deltas)")
+            # best_time = time.time() - start_time
+            # boolean_result = convert_to_boolean(best_solution)
+            print(f"Best solution: {best_solution}")
+            print(f"Best fitness: {best_fitness}")
+            # print(f"Taking {best_time} seconds.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
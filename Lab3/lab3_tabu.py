@@ -1,48 +1,36 @@
-from collections import deque
-import csv
 from itertools import combinations
+import os
 import random
+import sys
 import time
+from time import perf_counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.assignment import Assignment
+from shared.budget import Budget
+from shared.cnf import load_cnf
+from shared.flip_engine import ScoredFlipEvaluator
+from shared.parallel import record_runs
 
 max_runs = 30
 max_evaluations = 10000000
+# Wall-clock seconds per run, see shared.budget.Budget.
+max_seconds = None
+# JSON-lines file of each run's progress snapshots, {run} is replaced by the run number. None records nothing.
+progress_path = None
 tabu_tenure = 15
 
 def read_cnf_file(filename):
     """
     Used to read the CNF file and extract the necessary data.
     """
-    clauses = []
-    num_variables = 0
-    num_clauses = 0
-
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                line = line.strip()
-
-                # Ignores comments, the % at the end and also the 0 at the end of the file.
-                if line.startswith('c') or line.startswith('%') or line == '0':
-                    continue
-
-                # Reads the problem line to get the number of variables stated at the beginning of the CNF file.
-                if line.startswith('p cnf'):
-                    parts = line.split()
-                    num_variables = int(parts[2])
-                    num_clauses = int(parts[3])
-                    continue
-
-                # Process the clause lines by removing the 0 at the end of each line.
-                clause = list(map(int, line.split()))
-                if clause and clause[-1] == 0:
-                    clause.pop()
-                clauses.append(clause)
-    
+        cnf = load_cnf(filename)
     except FileNotFoundError:
         print(f"Error: File '{filename}' not found.")
         return None, None, None
 
-    return num_variables, num_clauses, clauses
+    return cnf.num_variables, cnf.num_clauses, cnf
 
 def num_clauses_satisfied(clause, possibility):
     """
@@ -68,83 +56,160 @@ def clause_counter(possibility, clauses):
 
     return clauses_satisfied    
 
-def tabu(num_variables, clauses):
+class ScoreBuckets:
     """
-    Implements the Tabu algorithm.
-    Starts with a random assignment of variables, evaluates neighbors, and 
-    continues improving until no better neighbor is found or the maximum number of evaluations is reached.
+    Variables grouped by flip score (make - break), so the best move is found by looking
+    at the highest non-empty bucket instead of scoring the whole neighbourhood.
+    Buckets are lists with a position index, so moving a variable costs O(1).
     """
-    current_possibility = [random.choice([0,1]) for _ in range(num_variables)]
-    tabu_list = deque(maxlen=tabu_tenure)
-    function_evaluations = 0
-    satisfied_clauses = clause_counter(current_possibility, clauses)
-    best_possibility = current_possibility[:]
-    best_satisfied_clauses = satisfied_clauses
 
-    while function_evaluations < max_evaluations:
-        improved = False
-        best_neighbor = None
-        best_neighbor_satisfied_clauses = -1
-
-        # Generate neighbors by flipping each bit
-        for i in range(num_variables):
-            neighbor = current_possibility[:]
-            neighbor[i] = 1 - neighbor[i]  # Flip the bit
-
-            if neighbor in tabu_list:
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.offset = max((len(occurrences) for occurrences in evaluator.occurrences), default=0)
+        self.buckets = [[] for _ in range(2 * self.offset + 1)]
+        self.score = [0] * evaluator.num_variables
+        self.position = [0] * evaluator.num_variables
+
+        for var in range(evaluator.num_variables):
+            self.score[var] = evaluator.flip_delta(var)
+            bucket = self.buckets[self.score[var] + self.offset]
+            self.position[var] = len(bucket)
+            bucket.append(var)
+
+    def update(self, variables):
+        """
+        Moves the given variables to the bucket of their current score.
+        """
+        for var in variables:
+            new_score = self.evaluator.flip_delta(var)
+            old_score = self.score[var]
+            if new_score == old_score:
                 continue
 
-            neighbor_satisfied_clauses = clause_counter(neighbor, clauses)
-            function_evaluations += 1
-
-            if neighbor_satisfied_clauses > best_neighbor_satisfied_clauses:
-                best_neighbor = neighbor
-                best_neighbor_satisfied_clauses = neighbor_satisfied_clauses
-
-            if function_evaluations >= max_evaluations:
-                break
-
-        if best_neighbor_satisfied_clauses > satisfied_clauses:
-            current_possibility = best_neighbor
-            satisfied_clauses = best_neighbor_satisfied_clauses
-            tabu_list.append(current_possibility)
-            improved = True
-
-        if satisfied_clauses > best_satisfied_clauses:
-            best_possibility = current_possibility[:]
-            best_satisfied_clauses = satisfied_clauses
-
-        if not improved:
+            bucket = self.buckets[old_score + self.offset]
+            last = bucket.pop()
+            if last != var:
+                bucket[self.position[var]] = last
+                self.position[last] = self.position[var]
+
+            bucket = self.buckets[new_score + self.offset]
+            self.position[var] = len(bucket)
+            bucket.append(var)
+            self.score[var] = new_score
+
+    def best_move(self, allowed):
+        """
+        Returns a random variable among the highest-scoring ones for which allowed(var, score) holds.
+        """
+        for index in range(len(self.buckets) - 1, -1, -1):
+            bucket = self.buckets[index]
+            if not bucket:
+                continue
+            start = random.randrange(len(bucket))
+            for step in range(len(bucket)):
+                var = bucket[(start + step) % len(bucket)]
+                if allowed(var, index - self.offset):
+                    return var
+        return None
+
+def tabu(num_variables, clauses, instrumentation=None, budget=None):
+    """
+    Implements the Tabu algorithm.
+    Starts with a random assignment of variables and keeps making the best move that is not tabu,
+    including sideways and worsening moves, until every clause is satisfied or the maximum number of
+    evaluations is reached. A flipped variable stays tabu for tabu_tenure iterations, unless flipping
+    it gives a new best (aspiration). Each move counts as one function evaluation,
+    the neighbours the bucket scan passes over do not (see shared.results).
+    The search returns its best-so-far assignment when the budget (max_evaluations and max_seconds unless a
+    shared.budget.Budget is passed in) runs out or a stop is requested.
+    """
+    timed = instrumentation is not None
+    if timed:
+        last = perf_counter()
+
+    current_possibility = Assignment.random(num_variables)
+    evaluator = ScoredFlipEvaluator(num_variables, clauses, current_possibility.bits)
+    buckets = ScoreBuckets(evaluator)
+    num_clauses = len(clauses)
+    tenure = min(tabu_tenure, num_variables - 1)
+    tabu_until = [0] * num_variables
+    function_evaluations = 0
+    plateau_steps = 0
+    iteration = 0
+    best_possibility = current_possibility.copy()
+    best_satisfied_clauses = evaluator.satisfied
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+
+    def allowed(var, score):
+        return tabu_until[var] <= iteration or evaluator.satisfied + score > best_satisfied_clauses
+
+    if timed:
+        now = perf_counter()
+        instrumentation.add_time('init', now - last)
+        instrumentation.count('restarts')
+        instrumentation.progress(best_satisfied_clauses, best_possibility.copy())
+        last = now
+
+    while best_satisfied_clauses < num_clauses and not budget.exhausted():
+        iteration += 1
+        var = buckets.best_move(allowed)
+        if var is None:
             break
 
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('neighbourhood', now - last)
+            last = now
+
+        if buckets.score[var] == 0:
+            plateau_steps += 1
+        evaluator.flip(var)
+        function_evaluations += 1
+        budget.spend()
+
+        if timed:
+            now = perf_counter()
+            instrumentation.add_time('evaluation', now - last)
+            instrumentation.count('evaluations')
+            last = now
+
+        buckets.update(evaluator.touched)
+        tabu_until[var] = iteration + tenure
+
+        if evaluator.satisfied > best_satisfied_clauses:
+            best_possibility.copy_from(current_possibility)
+            best_satisfied_clauses = evaluator.satisfied
+            if timed:
+                instrumentation.progress(best_satisfied_clauses, best_possibility.copy())
+
+        if timed:
+            if not iteration % 1024:
+                instrumentation.tick()
+            now = perf_counter()
+            instrumentation.add_time('bookkeeping', now - last)
+            last = now
+
+    if timed:
+        instrumentation.count('accepted_moves', function_evaluations)
+        instrumentation.count('plateau_steps', plateau_steps)
+
     return best_possibility, best_satisfied_clauses, function_evaluations
 
-def neighbourhood_checker(num_variables, clauses, output_csv='results.csv'):
+def tabu_run(run_num, num_variables, clauses, instrumentation=None):
+    start_time = time.time()
+    budget = Budget(max_evaluations, max_seconds)
+    best_possibility, best_satisfied_clauses, function_evaluations = tabu(num_variables, clauses, instrumentation, budget)
+    if best_satisfied_clauses == len(clauses):
+        budget.solved()
+    return best_possibility, best_satisfied_clauses, function_evaluations, time.time() - start_time
+
+def neighbourhood_checker(num_variables, clauses, output_csv='results.csv', seed=None, processes=None, instance='', cancel_on_solve=False):
     """
     Runs the tabu algorithm multiple times and tracks the best result across the runs.
-    Saves the results of each run to a CSV file.
+    Saves the results of each run to a CSV file, one row of the shared.results schema per run.
     """
-    best_clauses = 0
-    best_function_evaluations = 0
-    best_solution = []
-
-    # Prepare the CSV file
-    with open(output_csv, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(['Run', 'Satisfied Clauses', 'Function Evaluations', 'Solution'])
-
-        for run in range(max_runs):
-            current_solution, satisfied_clauses, function_evaluations = tabu(num_variables, clauses)
-            
-            # Save the result of the current run to the CSV file
-            writer.writerow([run + 1, satisfied_clauses, function_evaluations, current_solution])
-            
-            if satisfied_clauses > best_clauses:
-                best_clauses = satisfied_clauses
-                best_function_evaluations = function_evaluations
-                best_solution = current_solution
-
-    return best_solution, best_clauses, best_function_evaluations
+    return record_runs(tabu_run, max_runs, (num_variables, clauses), 'tabu', output_csv, seed, processes, instance, cancel_on_solve, progress_path)[:3]
 
 def convert_to_boolean(assignment):
     """
@@ -161,7 +226,7 @@ def main():
     
     for _ in range(max_runs):
         start_time = time.time()
-        best_solution = neighbourhood_checker(num_variables, clauses)
+        best_solution = neighbourhood_checker(num_variables, clauses, instance=os.path.basename(filename))
         best_time = time.time() - start_time
         boolean_result = convert_to_boolean(best_solution)
 
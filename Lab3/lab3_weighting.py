@@ -0,0 +1,202 @@
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from shared.assignment import Assignment
+from shared.budget import Budget
+from shared.cnf import load_cnf
+from shared.flip_engine import ScoredFlipEvaluator
+from shared.parallel import record_runs
+
+max_runs = 30
+max_evaluations = 10000000
+# Wall-clock seconds per run, see shared.budget.Budget.
+max_seconds = None
+# JSON-lines file of each run's progress snapshots, {run} is replaced by the run number. None records nothing.
+progress_path = None
+
+# PAWS: take a sideways move with this probability at a local minimum, otherwise raise the weights
+# of the unsatisfied clauses, and lower every raised weight after paws_max_increases raises.
+paws_flat_probability = 0.15
+paws_max_increases = 10
+
+# SAPS: multiply the weights of the unsatisfied clauses by saps_alpha at a local minimum, then with
+# probability saps_smooth_probability pull every weight back towards its input weight by saps_rho.
+saps_alpha = 1.3
+saps_rho = 0.8
+saps_smooth_probability = 0.05
+saps_walk_probability = 0.01
+
+# Scores are floats under SAPS, so "positive" means above this.
+score_epsilon = 1e-9
+
+def read_cnf_file(filename):
+    """
+    Used to read the CNF file and extract the necessary data.
+    Plain, gzipped and weighted (p wcnf) DIMACS are loaded by shared.cnf. The weights are None for an unweighted file.
+    """
+    try:
+        cnf = load_cnf(filename)
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
+        return None, None, None, None
+
+    return cnf.num_variables, cnf.num_clauses, cnf, cnf.weight_list() if cnf.weights is not None else None
+
+def best_flips(evaluator):
+    """
+    Returns the best score and the variables that have it, among the variables of the unsatisfied clauses.
+    Any variable with a positive score is in one of them, so no improving flip is missed.
+    """
+    make = evaluator.make
+    break_ = evaluator.break_
+    clauses = evaluator.clauses
+    best_score = None
+    candidates = []
+
+    for clause_index in evaluator.unsatisfied:
+        for literal in clauses[clause_index]:
+            var = abs(literal) - 1
+            score = make[var] - break_[var]
+            if best_score is None or score > best_score + score_epsilon:
+                best_score = score
+                candidates = [var]
+            elif score >= best_score - score_epsilon and var not in candidates:
+                candidates.append(var)
+
+    return best_score, candidates
+
+def clause_weighting(num_variables, clauses, clause_weights=None, scheme='paws', instrumentation=None, budget=None):
+    """
+    Implements dynamic clause-weighting local search (PAWS or SAPS).
+    Makes the best improving flip under the current clause weights. At a local minimum the weights of the
+    unsatisfied clauses are raised, so the search is pushed out of it, and the raised weights decay again
+    over time. Scores are kept incrementally by ScoredFlipEvaluator, so each flip only costs the clauses it
+    touches, and each flip counts as one function evaluation.
+    clause_weights are the input weights of a weighted MaxSAT instance (all 1 when not given). The best
+    assignment is the one with the highest satisfied input weight. It is returned when every clause is satisfied or
+    when the budget (max_evaluations and max_seconds unless a shared.budget.Budget is passed in) runs out or is stopped.
+    """
+    if clause_weights is None:
+        clause_weights = [1] * len(clauses)
+    total_weight = sum(clause_weights)
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+
+    current_possibility = Assignment.random(num_variables)
+    evaluator = ScoredFlipEvaluator(num_variables, clauses, current_possibility.bits, clause_weights)
+    raised = set()
+    increases = 0
+    function_evaluations = 0
+    plateau_steps = 0
+
+    best_possibility = current_possibility.copy()
+    best_satisfied_clauses = evaluator.satisfied
+    best_satisfied_weight = total_weight - evaluator.unsatisfied_input_weight
+
+    if instrumentation is not None:
+        instrumentation.count('restarts')
+        instrumentation.progress(best_satisfied_clauses, best_possibility.copy())
+
+    while evaluator.unsatisfied and not budget.exhausted():
+        best_score, candidates = best_flips(evaluator)
+
+        if best_score > score_epsilon:
+            var = random.choice(candidates)
+        elif scheme == 'paws' and best_score > -score_epsilon and random.random() < paws_flat_probability:
+            var = random.choice(candidates)
+            plateau_steps += 1
+        elif scheme == 'saps' and random.random() < saps_walk_probability:
+            var = random.randrange(num_variables)
+        else:
+            var = None
+
+        if var is not None:
+            evaluator.flip(var)
+            function_evaluations += 1
+            budget.spend()
+            if instrumentation is not None:
+                instrumentation.count('evaluations')
+
+            current_weight = total_weight - evaluator.unsatisfied_input_weight
+            if current_weight > best_satisfied_weight:
+                best_possibility.copy_from(current_possibility)
+                best_satisfied_clauses = evaluator.satisfied
+                best_satisfied_weight = current_weight
+                if instrumentation is not None:
+                    instrumentation.progress(best_satisfied_clauses, best_possibility.copy())
+            elif instrumentation is not None and not function_evaluations % 1024:
+                instrumentation.tick()
+            continue
+
+        # Local minimum: raise the weights of the unsatisfied clauses.
+        if scheme == 'paws':
+            for clause_index in list(evaluator.unsatisfied):
+                evaluator.add_weight(clause_index, clause_weights[clause_index])
+                raised.add(clause_index)
+            increases += 1
+            if increases == paws_max_increases:
+                increases = 0
+                for clause_index in list(raised):
+                    evaluator.add_weight(clause_index, -clause_weights[clause_index])
+                    if evaluator.weights[clause_index] <= clause_weights[clause_index]:
+                        raised.discard(clause_index)
+        else:
+            for clause_index in list(evaluator.unsatisfied):
+                evaluator.add_weight(clause_index, evaluator.weights[clause_index] * (saps_alpha - 1))
+            if random.random() < saps_smooth_probability:
+                for clause_index, weight in enumerate(evaluator.weights):
+                    target = saps_rho * weight + (1 - saps_rho) * clause_weights[clause_index]
+                    evaluator.add_weight(clause_index, target - weight)
+
+    if instrumentation is not None:
+        instrumentation.count('accepted_moves', function_evaluations)
+        instrumentation.count('plateau_steps', plateau_steps)
+
+    return best_possibility, best_satisfied_clauses, function_evaluations, best_satisfied_weight
+
+def weighting_run(run_num, num_variables, clauses, clause_weights, scheme, instrumentation=None):
+    """
+    One clause-weighting run. With clause_weights it also returns the satisfied input weight, which ranks the runs.
+    """
+    start_time = time.time()
+    budget = Budget(max_evaluations, max_seconds)
+    best_possibility, best_satisfied_clauses, function_evaluations, best_satisfied_weight = clause_weighting(num_variables, clauses, clause_weights, scheme, instrumentation, budget)
+    if best_satisfied_clauses == len(clauses):
+        budget.solved()
+    if clause_weights is None:
+        return best_possibility, best_satisfied_clauses, function_evaluations, time.time() - start_time
+    return best_possibility, best_satisfied_clauses, function_evaluations, time.time() - start_time, best_satisfied_weight
+
+def neighbourhood_checker(num_variables, clauses, clause_weights=None, scheme='paws', output_csv='results.csv', seed=None, processes=None, instance='', cancel_on_solve=False):
+    """
+    Runs the clause-weighting search multiple times and tracks the best result across the runs, by satisfied
+    input weight on a weighted instance. Saves the results of each run to a CSV file.
+    """
+    return record_runs(weighting_run, max_runs, (num_variables, clauses, clause_weights, scheme), scheme, output_csv, seed, processes, instance, cancel_on_solve, progress_path)
+
+def main():
+    print("Chose one of the algorithms below to execute:")
+    option = input("A - PAWS (additive clause weights)\nB - SAPS (multiplicative clause weights)\n")
+
+    if re.match("^[AB]$", option):
+        filename = input('Enter file name: \n')
+        num_variables, num_clauses, clauses, clause_weights = read_cnf_file(filename)
+        if num_variables is None or clauses is None:
+            return
+
+        scheme = 'paws' if option == 'A' else 'saps'
+        print("Running...")
+        best_solution, best_clauses, best_function_evaluations, best_weight = neighbourhood_checker(
+            num_variables, clauses, clause_weights, scheme, f"results_{scheme}.csv", instance=os.path.basename(filename))
+        if best_weight is not None:
+            print(f"Best: weight {best_weight} of {sum(clause_weights)} satisfied ({best_clauses} of {num_clauses} clauses) after {best_function_evaluations} evaluations.")
+        else:
+            print(f"Best: {best_clauses} of {num_clauses} clauses satisfied after {best_function_evaluations} evaluations.")
+        print("Finished.")
+
+if __name__ == "__main__":
+    main()
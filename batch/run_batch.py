@@ -0,0 +1,283 @@
+"""
+Non-interactive batch runner for the lab algorithms.
+
+Takes a JSON job spec and runs every combination of instance x algorithm x parameter setting x budget x seed
+across the local cores, largest instances first. Each finished job is appended to the results CSV (shared.results
+schema) and to a JSON-lines checkpoint manifest, so an interrupted sweep (Ctrl-C, or a killed process) picks up
+where it stopped when it is started again. Jobs already in the manifest or in the results file are skipped.
+
+    python batch/run_batch.py batch/example_spec.json
+    python batch/run_batch.py spec.json --processes 4 --dry-run
+
+Spec keys (paths are relative to the current directory):
+    instances    list of glob patterns of DIMACS files (plain, gzipped or p wcnf)
+    algorithms   list of names, see the algorithms table below
+    parameters   optional {algorithm: {name: [values, ...]}}, every combination of the values is run
+    seeds        list of ints
+    budgets      list of {"max_evaluations": n, "max_seconds": s}, either may be left out for no limit
+    preprocess   optional, true to search the formula reduced by shared.preprocess (unweighted instances only);
+                 solutions and clause counts are mapped back to the original formula
+    output       results CSV, default batch_results.csv
+    manifest     checkpoint manifest, default <output>.manifest.jsonl
+    progress     optional directory for the JSON-lines progress snapshots of shared.instrumentation,
+                 one file per job named after its instance, algorithm label and seed
+"""
+import argparse
+from glob import glob
+from itertools import product
+import json
+import multiprocessing
+import os
+import random
+import re
+import signal
+import sys
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'Lab2'))
+sys.path.insert(0, os.path.join(root, 'Lab3'))
+sys.path.insert(0, os.path.join(root, 'portfolio'))
+
+import lab2
+import run_portfolio
+from shared import budget as budgets
+from shared.budget import Budget, interruptible
+from shared.cnf import load_cnf
+from shared.instrumentation import Instrumentation
+from shared.preprocess import literal_true, preprocess
+from shared.results import ResultsWriter, iter_results
+from shared.solvers import registry
+
+# CNFs (or reductions) of the instances this worker has loaded, kept for the next job on the same instance.
+_instances = {}
+
+
+def run_portfolio_search(num_variables, num_clauses, clauses, weights, budget, instrumentation=None, schedule='luby'):
+    solution, satisfied, evaluations, _ = run_portfolio.portfolio(num_variables, clauses, schedule, budget=budget, instrumentation=instrumentation)
+    return [int(value) for value in solution], satisfied, evaluations
+
+
+# The shared solver registry, and the portfolio of them as one more algorithm.
+algorithms = dict(registry, portfolio=(run_portfolio, run_portfolio_search, ('schedule',)))
+
+
+def job_label(algorithm, parameters, budget, preprocessed=False):
+    """
+    The algorithm column of a job's results row: the algorithm, its parameters and its budget,
+    so runs of different settings stay apart in the results file.
+    """
+    parts = [algorithm + (' preprocessed' if preprocessed else '')]
+    parts.extend(f"{name}={value}" for name, value in sorted(parameters.items()))
+    if budget.get('max_evaluations') is not None:
+        parts.append(f"evaluations={budget['max_evaluations']}")
+    if budget.get('max_seconds') is not None:
+        parts.append(f"seconds={budget['max_seconds']}")
+    return ' '.join(parts)
+
+
+def job_key(job):
+    return f"{job['instance']}|{job['label']}|{job['seed']}"
+
+
+def parameter_settings(algorithm, grid):
+    """
+    Every combination of the parameter values given for one algorithm, as dicts.
+    """
+    module, _, keywords = algorithms[algorithm]
+    for name in grid:
+        if name not in keywords and not hasattr(module, name):
+            raise ValueError(f"Unknown parameter '{name}' for {algorithm}")
+    names = sorted(grid)
+    for values in product(*(grid[name] if isinstance(grid[name], list) else [grid[name]] for name in names)):
+        yield dict(zip(names, values))
+
+
+def expand_jobs(spec):
+    """
+    Turns a job spec into the list of jobs, largest instance files first.
+    """
+    instances = sorted({path for pattern in spec['instances'] for path in glob(pattern)})
+    if not instances:
+        raise ValueError("No instance matches the spec")
+    for algorithm in spec['algorithms']:
+        if algorithm not in algorithms:
+            raise ValueError(f"Unknown algorithm '{algorithm}', choose from {', '.join(algorithms)}")
+    if spec.get('preprocess'):
+        # The reduction drops the clause weights, so MaxSAT runs would be scored as plain SAT.
+        for instance in instances:
+            if load_cnf(instance).weights is not None:
+                raise ValueError(f"'{instance}' is weighted (p wcnf), preprocessing is for unweighted instances only")
+
+    budget_list = spec.get('budgets') or [{'max_evaluations': lab2.max_evaluations}]
+    jobs = []
+    for instance in instances:
+        size = os.path.getsize(instance)
+        for algorithm in spec['algorithms']:
+            for parameters in parameter_settings(algorithm, spec.get('parameters', {}).get(algorithm, {})):
+                for budget in budget_list:
+                    for seed in spec['seeds']:
+                        jobs.append({
+                            'instance': instance,
+                            'size': size,
+                            'algorithm': algorithm,
+                            'parameters': parameters,
+                            'budget': budget,
+                            'seed': seed,
+                            'preprocess': bool(spec.get('preprocess')),
+                            'progress': spec.get('progress'),
+                            'label': job_label(algorithm, parameters, budget, spec.get('preprocess')),
+                        })
+
+    jobs.sort(key=lambda job: -job['size'])
+    return jobs
+
+
+def completed_keys(output, manifest):
+    """
+    Keys of the jobs recorded in the manifest or already present in the results file.
+    """
+    keys = set()
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            for line in file:
+                if line.strip():
+                    keys.add(json.loads(line)['key'])
+    if os.path.exists(output) and os.path.getsize(output):
+        for row in iter_results(output):
+            keys.add(f"{row['instance']}|{row['algorithm']}|{row['seed']}")
+    return keys
+
+
+def init_worker(stop_event):
+    budgets.stop_event = stop_event
+    # Only the parent handles Ctrl-C, it stops the workers through the shared event.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_job(job):
+    """
+    Runs one job in a worker with the job's seed, parameters and budget.
+    Returns None if the sweep was stopped before the job started, and marks jobs cut short by a stop as interrupted.
+    """
+    if budgets.stop_event.is_set():
+        return None
+
+    key = (job['instance'], job['preprocess'])
+    cnf = _instances.get(key)
+    if cnf is None:
+        # The searches read the memory-mapped CNF, every worker maps the same compiled cache.
+        loaded = load_cnf(job['instance'])
+        reduction = preprocess(loaded.num_variables, loaded.to_lists()) if job['preprocess'] else None
+        if reduction is not None and not reduction.unsatisfiable:
+            cnf = (reduction.num_variables, len(reduction.clauses), reduction.clauses, None, reduction, loaded.num_clauses, None)
+        else:
+            cnf = (loaded.num_variables, loaded.num_clauses, loaded, loaded.weight_list(), None, loaded.num_clauses, loaded.weights is not None)
+        _instances[key] = cnf
+    num_variables, num_clauses, clauses, weights, reduction, original_num_clauses, weighted = cnf
+
+    module, runner, keywords = algorithms[job['algorithm']]
+    settings = {name: value for name, value in job['parameters'].items() if name not in keywords}
+    arguments = {name: value for name, value in job['parameters'].items() if name in keywords}
+    previous = {name: getattr(module, name) for name in settings}
+
+    random.seed(job['seed'])
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        numpy.random.seed(job['seed'])
+
+    budget = Budget(job['budget'].get('max_evaluations'), job['budget'].get('max_seconds'))
+    instrumentation = None
+    if job['progress'] is not None:
+        instrumentation = Instrumentation(jsonl_path=os.path.join(job['progress'], re.sub(r'[^\w.=-]+', '_', job_key(job)).strip('_') + '.jsonl'))
+    for name, value in settings.items():
+        setattr(module, name, value)
+    try:
+        start_time = time.time()
+        if clauses:
+            solution, satisfied, evaluations = runner(num_variables, num_clauses, clauses, weights, budget, instrumentation, **arguments)
+        else:
+            # Preprocessing solved the whole formula.
+            solution, satisfied, evaluations = [0] * num_variables, 0, 0
+        interrupted = budgets.stop_event.is_set() and satisfied < num_clauses
+        if reduction is not None:
+            solution, satisfied = reduction.restore_result(solution)
+        seconds = time.time() - start_time
+        weight = None
+        if weighted:
+            weight = sum(clause_weight for clause, clause_weight in zip(clauses, weights) if any(literal_true(literal, solution) for literal in clause))
+    finally:
+        for name, value in previous.items():
+            setattr(module, name, value)
+        if instrumentation is not None:
+            instrumentation.close()
+
+    return job, solution, satisfied, original_num_clauses, evaluations, seconds, interrupted, weight
+
+
+def run_batch(spec, processes=None, dry_run=False):
+    """
+    Runs every job of the spec that is not done yet, recording each one as soon as it finishes.
+    Returns the number of jobs run.
+    """
+    output = spec.get('output', 'batch_results.csv')
+    manifest = spec.get('manifest', f"{output}.manifest.jsonl")
+    jobs = expand_jobs(spec)
+    done = completed_keys(output, manifest)
+    pending = [job for job in jobs if job_key(job) not in done]
+    print(f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, {len(pending)} to run.")
+
+    if dry_run or not pending:
+        for job in pending:
+            print(f"  {job['instance']} {job['label']} seed {job['seed']}")
+        return 0
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = max(1, min(processes, len(pending)))
+    if spec.get('progress'):
+        os.makedirs(spec['progress'], exist_ok=True)
+    stop_event = multiprocessing.Event()
+    finished = 0
+
+    with ResultsWriter(output) as writer, open(manifest, 'a') as checkpoint, \
+            multiprocessing.Pool(processes, initializer=init_worker, initargs=(stop_event,)) as pool, interruptible(stop_event):
+        for result in pool.imap_unordered(run_job, pending):
+            if result is None:
+                continue
+            job, solution, satisfied, num_clauses, evaluations, seconds, interrupted, weight = result
+            if interrupted:
+                print(f"Stopped {job['instance']} {job['label']} seed {job['seed']}, it will run again on resume.")
+                continue
+
+            writer.write(job['instance'], job['label'], job['seed'], 1, satisfied, evaluations, seconds, solution, weight)
+            writer.flush()
+            checkpoint.write(json.dumps({'key': job_key(job), 'clauses': satisfied, 'evaluations': evaluations, 'seconds': seconds}) + '\n')
+            checkpoint.flush()
+            finished += 1
+            print(f"[{finished}/{len(pending)}] {job['instance']} {job['label']} seed {job['seed']}: "
+                  f"{satisfied}/{num_clauses} clauses, {evaluations} evaluations, {seconds:.2f} s")
+
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a sweep of the lab algorithms from a JSON job spec.")
+    parser.add_argument('spec', help="JSON job spec, see the module docstring")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes, all cores by default")
+    parser.add_argument('--dry-run', action='store_true', help="list the jobs that would run and exit")
+    args = parser.parse_args()
+
+    with open(args.spec) as file:
+        spec = json.load(file)
+
+    try:
+        run_batch(spec, args.processes, args.dry_run)
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Benchmark harness for the lab algorithms.
+
+Runs every algorithm non-interactively on the bundled uf instances with fixed seeds and reports
+evaluations/sec, flips/sec of the evaluation engines, time-to-target traces, run-length
+distributions and peak memory. Results can be stored as JSON baselines and compared later,
+and every fast evaluator is cross-checked against the reference clause_counter. Baselines are
+machine dependent, so none is committed: save one on the machine before comparing against it.
+
+    python benchmarks/run_benchmarks.py --save baseline
+    python benchmarks/run_benchmarks.py --compare baseline
+    python benchmarks/run_benchmarks.py --compare /path/to/other.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'Lab2'))
+sys.path.insert(0, os.path.join(root, 'Lab3'))
+
+import lab2
+import lab3_genetic
+from shared.budget import Budget
+from shared.fitness_cache import FitnessCache
+from shared.flip_engine import FlipEvaluator, ScoredFlipEvaluator
+from shared.instrumentation import Instrumentation
+from shared.solvers import registry
+
+try:
+    from shared.batch_eval import BatchEvaluator
+except ImportError:
+    BatchEvaluator = None
+
+baselines_directory = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+default_instances = ['uf50-010.cnf', 'uf75-0100.cnf', 'uf100-01.cnf', 'uf250-01.cnf']
+default_seeds = [0, 1, 2]
+# Keyword parameters of the registry solvers. The budget ends the GA, not the number of generations.
+solver_arguments = {'genetic': {'num_generations': sys.maxsize}}
+
+
+def trace_recorder(trace):
+    """
+    Instrumentation that appends (seconds, evaluations so far, best clauses) to trace whenever the best improves.
+    """
+    def record(snapshot):
+        if not trace or snapshot['best_clauses'] > trace[-1][2]:
+            trace.append((snapshot['seconds'], snapshot['counters']['evaluations'], snapshot['best_clauses']))
+    return Instrumentation(callback=record, interval=0)
+
+
+def run_solver(name, num_variables, num_clauses, clauses, budget):
+    """
+    One run of a registry solver with an evaluation budget. Returns its best clauses, evaluations and trace.
+    """
+    trace = []
+    _, best, evaluations = registry[name][1](num_variables, num_clauses, clauses, None, Budget(budget), trace_recorder(trace), **solver_arguments.get(name, {}))
+    return best, evaluations, trace
+
+
+def baseline_path(name):
+    """
+    A baseline is given by name (baselines/NAME.json) or as the path of a JSON file.
+    """
+    if name.endswith('.json'):
+        return name
+    return os.path.join(baselines_directory, f"{name}.json")
+
+
+def instance_path(name):
+    for directory in ('Lab2', 'Lab3', 'Lab1'):
+        path = os.path.join(root, directory, name)
+        if os.path.exists(path):
+            return path
+    return name
+
+
+def distribution(values):
+    if not values:
+        return None
+    values = sorted(values)
+    return {'min': values[0], 'median': statistics.median(values), 'mean': statistics.fmean(values), 'max': values[-1], 'values': values}
+
+
+def benchmark_algorithm(name, num_variables, num_clauses, clauses, budget, seeds):
+    """
+    Runs one algorithm once per seed, then once more under tracemalloc for the peak memory.
+    """
+    runs = []
+    for seed in seeds:
+        random.seed(seed)
+        start = time.perf_counter()
+        best, evaluations, trace = run_solver(name, num_variables, num_clauses, clauses, budget)
+        seconds = time.perf_counter() - start
+        solved = best == num_clauses
+        runs.append({
+            'seed': seed,
+            'best': best,
+            'evaluations': evaluations,
+            'seconds': seconds,
+            'solved': solved,
+            'time_to_target': trace[-1][0] if solved else None,
+            'trace': trace,
+        })
+
+    random.seed(seeds[0])
+    tracemalloc.start()
+    run_solver(name, num_variables, num_clauses, clauses, budget)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    total_seconds = sum(run['seconds'] for run in runs)
+    return {
+        'runs': runs,
+        'best': [run['best'] for run in runs],
+        'evaluations_per_second': sum(run['evaluations'] for run in runs) / total_seconds if total_seconds else None,
+        'success_rate': sum(run['solved'] for run in runs) / len(runs),
+        'run_length': distribution([run['evaluations'] for run in runs if run['solved']]),
+        'time_to_target': distribution([run['time_to_target'] for run in runs if run['solved']]),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def flips_per_second(evaluator_class, num_variables, clauses, num_flips=20000):
+    random.seed(0)
+    evaluator = evaluator_class(num_variables, clauses, [random.choice([0, 1]) for _ in range(num_variables)])
+    variables = [random.randrange(num_variables) for _ in range(num_flips)]
+    start = time.perf_counter()
+    for var in variables:
+        evaluator.flip_delta(var)
+        evaluator.flip(var)
+    return num_flips / (time.perf_counter() - start)
+
+
+def cross_check(num_variables, clauses, num_checks=200):
+    """
+    Compares every fast evaluator with lab2.clause_counter on random assignments and flips: the satisfied
+    counts and deltas, the weighted scores of ScoredFlipEvaluator and the FitnessCache lookups.
+    Returns a list of mismatch descriptions, empty when everything agrees.
+    """
+    random.seed(12345)
+    mismatches = []
+    possibility = [random.choice([0, 1]) for _ in range(num_variables)]
+    flip_evaluator = FlipEvaluator(num_variables, clauses, possibility)
+    scored_evaluator = ScoredFlipEvaluator(num_variables, clauses, possibility[:])
+
+    for check in range(num_checks):
+        var = random.randrange(num_variables)
+        reference = lab2.clause_counter(possibility, clauses)
+        flipped = possibility[:]
+        flipped[var] = 1 - flipped[var]
+        expected_delta = lab2.clause_counter(flipped, clauses) - reference
+
+        for name, evaluator in (('FlipEvaluator', flip_evaluator), ('ScoredFlipEvaluator', scored_evaluator)):
+            if evaluator.satisfied != reference:
+                mismatches.append(f"{name}: satisfied {evaluator.satisfied} != {reference} at check {check}")
+            if evaluator.flip_delta(var) != expected_delta:
+                mismatches.append(f"{name}: delta of {var} is {evaluator.flip_delta(var)} != {expected_delta} at check {check}")
+
+        pair = random.sample(range(num_variables), min(3, num_variables))
+        moved = possibility[:]
+        for index in pair:
+            moved[index] = 1 - moved[index]
+        if reference + flip_evaluator.flips_delta(pair) != lab2.clause_counter(moved, clauses):
+            mismatches.append(f"FlipEvaluator: flips_delta of {pair} disagrees at check {check}")
+
+        flip_evaluator.flip(var)
+        scored_evaluator.flip(var)
+
+    # Weighted scores: the delta is the change in satisfied weight, also after the weights are raised.
+    input_weights = [random.randint(1, 9) for _ in clauses]
+    weighted_evaluator = ScoredFlipEvaluator(num_variables, clauses, possibility[:], input_weights)
+    for check in range(num_checks):
+        var = random.randrange(num_variables)
+        flipped = weighted_evaluator.possibility[:]
+        flipped[var] = 1 - flipped[var]
+        weights = weighted_evaluator.weights
+        before = [lab2.num_clauses_satisfied(clause, weighted_evaluator.possibility) for clause in clauses]
+        after = [lab2.num_clauses_satisfied(clause, flipped) for clause in clauses]
+        expected_delta = sum(weight * (now - was) for weight, now, was in zip(weights, after, before))
+        if weighted_evaluator.unsatisfied_weight != sum(weight for weight, satisfied in zip(weights, before) if not satisfied):
+            mismatches.append(f"ScoredFlipEvaluator: unsatisfied weight {weighted_evaluator.unsatisfied_weight} disagrees at check {check}")
+        if weighted_evaluator.unsatisfied_input_weight != sum(weight for weight, satisfied in zip(input_weights, before) if not satisfied):
+            mismatches.append(f"ScoredFlipEvaluator: unsatisfied input weight {weighted_evaluator.unsatisfied_input_weight} disagrees at check {check}")
+        if weighted_evaluator.flip_delta(var) != expected_delta:
+            mismatches.append(f"ScoredFlipEvaluator: weighted delta of {var} is {weighted_evaluator.flip_delta(var)} != {expected_delta} at check {check}")
+        weighted_evaluator.flip(var)
+        weighted_evaluator.add_weight(random.randrange(len(clauses)), random.randint(1, 3))
+
+    population = [[random.choice([0, 1]) for _ in range(num_variables)] for _ in range(50)]
+    reference_scores = [lab2.clause_counter(row, clauses) for row in population]
+    if [lab3_genetic.fitness(row, clauses) for row in population] != reference_scores:
+        mismatches.append("lab3_genetic.fitness disagrees with clause_counter")
+    if BatchEvaluator is not None and BatchEvaluator(clauses).score(population).tolist() != reference_scores:
+        mismatches.append("BatchEvaluator disagrees with clause_counter")
+
+    # FitnessCache: cached parents, repeated lookups and children scored as deltas from a parent.
+    cache = FitnessCache(num_variables, clauses, max_size=len(population))
+    if [cache.fitness(row) for row in population] != reference_scores or [cache.fitness(row) for row in population] != reference_scores:
+        mismatches.append("FitnessCache disagrees with clause_counter on cached assignments")
+    children = []
+    for row in population:
+        child = row[:]
+        for index in random.sample(range(num_variables), max(1, num_variables // 10)):
+            child[index] = 1 - child[index]
+        children.append((child, row))
+    if [cache.fitness(child, (parent,)) for child, parent in children] != [lab2.clause_counter(child, clauses) for child, _ in children]:
+        mismatches.append("FitnessCache disagrees with clause_counter on children scored from a parent")
+
+    return mismatches
+
+
+def run_suite(instances, algorithm_names, budget, seeds):
+    results = {'meta': {
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'budget': budget,
+        'seeds': seeds,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }, 'instances': {}}
+    all_mismatches = []
+
+    for instance in instances:
+        num_variables, num_clauses, clauses = lab2.read_cnf_file(instance_path(instance))
+        if num_variables is None:
+            continue
+
+        mismatches = cross_check(num_variables, clauses)
+        all_mismatches.extend(f"{instance}: {mismatch}" for mismatch in mismatches)
+        entry = {
+            'num_variables': num_variables,
+            'num_clauses': num_clauses,
+            'cross_check_mismatches': mismatches,
+            'flips_per_second': {
+                'FlipEvaluator': flips_per_second(FlipEvaluator, num_variables, clauses),
+                'ScoredFlipEvaluator': flips_per_second(ScoredFlipEvaluator, num_variables, clauses),
+            },
+            'algorithms': {},
+        }
+
+        for name in algorithm_names:
+            entry['algorithms'][name] = benchmark_algorithm(name, num_variables, num_clauses, clauses, budget, seeds)
+            summary = entry['algorithms'][name]
+            print(f"{instance:14} {name:12} best {summary['best']} evals/s {summary['evaluations_per_second']:.0f} "
+                  f"solved {summary['success_rate']:.0%} peak {summary['peak_memory_bytes'] / 1024:.0f} KiB")
+        print(f"{instance:14} flips/s " + ', '.join(f"{name} {value:.0f}" for name, value in entry['flips_per_second'].items()))
+
+        results['instances'][instance] = entry
+
+    return results, all_mismatches
+
+
+def flatten_metrics(results):
+    """
+    The numbers worth diffing between two runs, keyed by instance/metric.
+    """
+    metrics = {}
+    for instance, entry in results['instances'].items():
+        for name, value in entry['flips_per_second'].items():
+            metrics[f"{instance}/flips_per_second/{name}"] = value
+        for name, summary in entry['algorithms'].items():
+            metrics[f"{instance}/{name}/evaluations_per_second"] = summary['evaluations_per_second']
+            metrics[f"{instance}/{name}/mean_best"] = statistics.fmean(summary['best'])
+            metrics[f"{instance}/{name}/success_rate"] = summary['success_rate']
+            metrics[f"{instance}/{name}/peak_memory_bytes"] = summary['peak_memory_bytes']
+            if summary['time_to_target']:
+                metrics[f"{instance}/{name}/median_time_to_target"] = summary['time_to_target']['median']
+    return metrics
+
+
+def compare(baseline, results, tolerance):
+    """
+    Prints every metric next to its baseline. Returns the metrics that moved the wrong way by more than tolerance.
+    """
+    old_metrics = flatten_metrics(baseline)
+    new_metrics = flatten_metrics(results)
+    regressions = []
+    # Lower is better for these, higher is better for the rest.
+    lower_is_better = ('peak_memory_bytes', 'median_time_to_target')
+
+    for key in sorted(set(old_metrics) & set(new_metrics)):
+        old, new = old_metrics[key], new_metrics[key]
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        worse = change > tolerance if key.endswith(lower_is_better) else change < -tolerance
+        print(f"{key:60} {old:14.2f} -> {new:14.2f} {change:+7.1%}{'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(key)
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lab algorithms on the bundled uf instances.")
+    parser.add_argument('--instances', nargs='+', default=default_instances)
+    parser.add_argument('--algorithms', nargs='+', default=list(registry), choices=list(registry))
+    parser.add_argument('--budget', type=int, default=20000, help="evaluations per run")
+    parser.add_argument('--seeds', nargs='+', type=int, default=default_seeds)
+    parser.add_argument('--save', metavar='NAME', help="store the results as baselines/NAME.json, or at NAME if it ends in .json")
+    parser.add_argument('--compare', metavar='NAME', help="diff the results against baselines/NAME.json, or NAME if it ends in .json")
+    parser.add_argument('--tolerance', type=float, default=0.1, help="relative change reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare and not os.path.exists(baseline_path(args.compare)):
+        print(f"Error: Baseline '{baseline_path(args.compare)}' not found. Store one first with --save.")
+        sys.exit(1)
+
+    results, mismatches = run_suite(args.instances, args.algorithms, args.budget, args.seeds)
+
+    for mismatch in mismatches:
+        print(f"Cross-check failed: {mismatch}")
+
+    regressions = []
+    if args.compare:
+        with open(baseline_path(args.compare)) as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path(args.save))), exist_ok=True)
+        with open(baseline_path(args.save), 'w') as file:
+            json.dump(results, file, indent=1)
+
+    if mismatches or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Adaptive portfolio of the lab searches.
+
+Shares one evaluation (and optional wall-clock) budget among next-ascent, VNA, tabu and the GA. The budget is
+handed out in slices: every slice is a fresh restart of one solver, and the slice lengths follow a Luby
+(1, 1, 2, 1, 1, 2, 4, ...) or geometric schedule in units of restart_unit evaluations, counted per solver.
+After each solver has had one slice, the next slice goes to the solver with the best recent improvement
+rate per evaluation (with probability exploration_rate to a random one instead), so the budget drifts to
+whichever search works best on the instance at hand.
+
+    python portfolio/run_portfolio.py Lab3/uf250-01.cnf
+    python portfolio/run_portfolio.py Lab3/uf100-01.cnf --schedule geometric --evaluations 200000 --runs 5
+"""
+import argparse
+from math import log1p
+import os
+import random
+import sys
+import time
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+
+from shared.budget import Budget
+from shared.cnf import load_cnf
+from shared.parallel import new_base_seed, parallel_runs, run_seed
+from shared.results import ResultsWriter
+from shared.solvers import registry
+
+max_runs = 30
+max_evaluations = 1000000
+max_seconds = None
+
+# Slice length unit in evaluations per variable, and the growth factor of the geometric schedule.
+restart_unit = 10
+geometric_factor = 1.5
+exploration_rate = 0.1
+# Weight of the newest slice in a solver's smoothed improvement rate.
+rate_smoothing = 0.5
+
+
+def luby(index):
+    """
+    The index-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    index += 1
+    while True:
+        size = 1
+        while size < index:
+            size = 2 * size + 1
+        # Terms 2^(k-1) .. 2^k - 1 repeat the first 2^(k-1) - 1 terms and end with 2^(k-1).
+        if size == index:
+            return (size + 1) // 2
+        index -= size // 2
+
+
+def slice_length(schedule, index, unit):
+    if schedule == 'geometric':
+        return int(unit * geometric_factor ** index)
+    return unit * luby(index)
+
+
+# Solvers of the shared registry the portfolio hands slices to, with their keyword parameters.
+# The slice budget ends the GA, not the number of generations.
+solvers = {
+    'next_ascent': {},
+    'vna': {},
+    'tabu': {},
+    'genetic': {'num_generations': sys.maxsize},
+}
+
+
+def expected_unsatisfied(clauses):
+    """
+    Expected number of clauses a uniformly random assignment leaves unsatisfied, where every slice starts from.
+    """
+    return sum(0.5 ** len({abs(literal) for literal in clause}) for clause in clauses)
+
+
+def portfolio(num_variables, clauses, schedule='luby', names=tuple(solvers), budget=None, instrumentation=None):
+    """
+    Runs the portfolio until every clause is satisfied or the budget (max_evaluations and max_seconds
+    unless a shared.budget.Budget is passed in) runs out or is stopped. Every slice reports to the instrumentation.
+    The improvement rate of a slice is the drop in log(1 + unsatisfied clauses) from a random start
+    to the slice's best, per evaluation, so the last few clauses count as much as the first many.
+    Returns the best assignment, its satisfied clauses, the evaluations used and the evaluations per solver.
+    """
+    if budget is None:
+        budget = Budget(max_evaluations, max_seconds)
+    num_clauses = len(clauses)
+    unit = max(1, restart_unit * num_variables)
+    start_score = log1p(expected_unsatisfied(clauses))
+    slices = dict.fromkeys(names, 0)
+    rates = dict.fromkeys(names, None)
+    allocation = dict.fromkeys(names, 0)
+    best_solution = None
+    best_satisfied = -1
+
+    while not budget.exhausted():
+        untried = [name for name in names if rates[name] is None]
+        if untried:
+            name = untried[0]
+        elif random.random() < exploration_rate:
+            name = random.choice(names)
+        else:
+            name = max(names, key=lambda name: rates[name])
+
+        length = slice_length(schedule, slices[name], unit)
+        remaining = budget.remaining_evaluations()
+        if remaining is not None:
+            length = min(length, remaining)
+        seconds_left = budget.max_seconds - budget.seconds() if budget.max_seconds is not None else None
+        if seconds_left is not None and seconds_left <= 0:
+            break
+        slice_budget = Budget(length, seconds_left)
+
+        solution, satisfied, _ = registry[name][1](num_variables, num_clauses, clauses, None, slice_budget, instrumentation, **solvers[name])
+        used = slice_budget.evaluations
+        budget.spend(used)
+        slices[name] += 1
+        allocation[name] += used
+
+        if satisfied > best_satisfied:
+            best_solution = solution
+            best_satisfied = satisfied
+        # A slice cut short by the outer limit says nothing about the solver's rate.
+        if best_satisfied == num_clauses or budget.exhausted():
+            break
+        if used:
+            rate = (start_score - log1p(num_clauses - satisfied)) / used
+            rates[name] = rate if rates[name] is None else rate_smoothing * rate + (1 - rate_smoothing) * rates[name]
+        # A stop request or the wall-clock limit ends the slice and the portfolio alike.
+        if slice_budget.stopped:
+            break
+
+    return best_solution, best_satisfied, budget.evaluations, allocation
+
+
+def portfolio_run(run_num, num_variables, clauses, schedule, evaluations, seconds):
+    start_time = time.time()
+    budget = Budget(evaluations, seconds)
+    best_solution, best_satisfied, evaluations, allocation = portfolio(num_variables, clauses, schedule, budget=budget)
+    if best_satisfied == len(clauses):
+        budget.solved()
+    return best_solution, best_satisfied, evaluations, time.time() - start_time, allocation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the adaptive portfolio of the lab searches on one instance.")
+    parser.add_argument('instance')
+    parser.add_argument('--schedule', choices=('luby', 'geometric'), default='luby')
+    parser.add_argument('--runs', type=int, default=max_runs)
+    parser.add_argument('--evaluations', type=int, default=max_evaluations, help="evaluation budget per run")
+    parser.add_argument('--seconds', type=float, default=max_seconds, help="wall-clock budget per run")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--output', default='results_portfolio.csv')
+    args = parser.parse_args()
+
+    try:
+        cnf = load_cnf(args.instance)
+    except FileNotFoundError:
+        print(f"Error: File '{args.instance}' not found.")
+        sys.exit(1)
+    seed = args.seed if args.seed is not None else new_base_seed()
+    print(f"Seed: {seed}")
+
+    totals = {}
+    with ResultsWriter(args.output) as writer:
+        runs = parallel_runs(portfolio_run, args.runs, (cnf.num_variables, cnf, args.schedule, args.evaluations, args.seconds), seed, args.processes)
+        for run, result in enumerate(runs):
+            if result is None:
+                print(f"Run {run + 1} cancelled.")
+                continue
+            solution, satisfied, evaluations, seconds, allocation = result
+            writer.write(os.path.basename(args.instance), f"portfolio_{args.schedule}", run_seed(seed, run), run + 1, satisfied, evaluations, seconds, solution)
+            for name, used in allocation.items():
+                totals[name] = totals.get(name, 0) + used
+            print(f"Run {run + 1}: {satisfied}/{len(cnf)} clauses, {evaluations} evaluations, "
+                  + ', '.join(f"{name} {used}" for name, used in allocation.items()))
+
+    spent = sum(totals.values())
+    if spent:
+        print("Budget share: " + ', '.join(f"{name} {used / spent:.0%}" for name, used in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+"""
+Code shared by the lab scripts (evaluation engines, loaders and runners).
+"""
@@ -0,0 +1,105 @@
+import random
+
+
+class Assignment:
+    """
+    Compact truth assignment: one byte (0 or 1) per variable in a bytearray, indexed from 0.
+    It is a sequence of ints, so it can be used wherever the searches used lists of 0s and 1s, and
+    the evaluators work on its bits directly. Flips, copies and comparisons happen in place, so a search
+    that reuses its Assignment objects does not copy assignments per move.
+    Hashing uses the current contents, so do not change an Assignment while it is a dict key.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, values=()):
+        self.bits = values if isinstance(values, bytearray) else bytearray(1 if value else 0 for value in values)
+
+    @classmethod
+    def zeros(cls, num_variables):
+        return cls(bytearray(num_variables))
+
+    @classmethod
+    def random(cls, num_variables, choices=(0, 1)):
+        """
+        A uniformly random assignment, drawing random.choice(choices) once per variable.
+        """
+        return cls(bytearray(random.choice(choices) for _ in range(num_variables)))
+
+    def __len__(self):
+        return len(self.bits)
+
+    def __getitem__(self, var):
+        return self.bits[var]
+
+    def __setitem__(self, var, value):
+        self.bits[var] = 1 if value else 0
+
+    def __iter__(self):
+        return iter(self.bits)
+
+    def __eq__(self, other):
+        if isinstance(other, Assignment):
+            return self.bits == other.bits
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(bytes(self.bits))
+
+    def __repr__(self):
+        return f"Assignment('{self.bits.translate(digits).decode()}')"
+
+    def __reduce__(self):
+        return Assignment, (self.bits,)
+
+    def flip(self, var):
+        self.bits[var] ^= 1
+
+    def flip_all(self, variables):
+        bits = self.bits
+        for var in variables:
+            bits[var] ^= 1
+
+    # A flip is its own inverse, the undo names only say what the caller means.
+    undo_flip = flip
+    undo_flips = flip_all
+
+    def copy(self):
+        return Assignment(bytearray(self.bits))
+
+    def copy_from(self, other):
+        """
+        Overwrites this assignment with other (of the same length) without allocating.
+        """
+        self.bits[:] = other.bits
+
+    def as_int(self):
+        """
+        The bits as one int (8 bits per variable), used for whole-assignment bit operations.
+        """
+        return int.from_bytes(self.bits, 'little')
+
+    def hamming(self, other):
+        """
+        Number of variables on which the two assignments differ.
+        """
+        return (self.as_int() ^ other.as_int()).bit_count()
+
+    def differences(self, other):
+        """
+        The variables on which the two assignments differ, in increasing order.
+        """
+        different = self.as_int() ^ other.as_int()
+        variables = []
+        while different:
+            lowest = different & -different
+            variables.append((lowest.bit_length() - 1) >> 3)
+            different ^= lowest
+        return variables
+
+    def to_list(self):
+        return list(self.bits)
+
+
+# Maps the 0/1 bytes of an assignment to the characters '0' and '1'.
+digits = bytes.maketrans(b'\x00\x01', b'01')
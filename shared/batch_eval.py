@@ -0,0 +1,69 @@
+import numpy as np
+
+from shared.cnf import CNF
+
+
+class BatchEvaluator:
+    """
+    Scores many assignments per call with NumPy.
+    The clause list (or the flat arrays of a shared.cnf.CNF) is compiled once into padded literal
+    index/sign arrays, and a whole (assignments x variables) matrix is then scored with a few vectorized operations.
+    """
+
+    def __init__(self, clauses):
+        self.num_clauses = len(clauses)
+        if isinstance(clauses, CNF):
+            offsets = np.asarray(clauses.offsets)
+            literals = np.asarray(clauses.literals)[offsets[0]:offsets[-1]]
+            lengths = np.diff(offsets)
+            width = int(lengths.max()) if self.num_clauses else 0
+        else:
+            width = max((len(clause) for clause in clauses), default=0)
+
+        self.indices = np.zeros((self.num_clauses, width), dtype=np.intp)
+        self.signs = np.zeros((self.num_clauses, width), dtype=bool)
+        self.valid = np.zeros((self.num_clauses, width), dtype=bool)
+
+        if isinstance(clauses, CNF):
+            rows = np.repeat(np.arange(self.num_clauses), lengths)
+            positions = np.arange(offsets[0], offsets[-1]) - np.repeat(offsets[:-1], lengths)
+            self.indices[rows, positions] = np.abs(literals) - 1
+            self.signs[rows, positions] = literals > 0
+            self.valid[rows, positions] = True
+            return
+
+        for clause_index, clause in enumerate(clauses):
+            for position, literal in enumerate(clause):
+                self.indices[clause_index, position] = abs(literal) - 1
+                self.signs[clause_index, position] = literal > 0
+                self.valid[clause_index, position] = True
+
+    def clause_mask(self, assignments):
+        """
+        Returns a (assignments x clauses) boolean matrix telling which clauses each assignment satisfies.
+        """
+        assignments = np.asarray(assignments).astype(bool, copy=False)
+        if assignments.ndim == 1:
+            assignments = assignments[np.newaxis, :]
+
+        satisfied = np.zeros((assignments.shape[0], self.num_clauses), dtype=bool)
+
+        # One pass per literal position keeps memory at assignments x clauses.
+        for position in range(self.indices.shape[1]):
+            literal_true = assignments[:, self.indices[:, position]] == self.signs[:, position]
+            literal_true &= self.valid[:, position]
+            satisfied |= literal_true
+
+        return satisfied
+
+    def score(self, assignments, return_mask=False):
+        """
+        Counts the satisfied clauses of every row of assignments (0/1 or bool values).
+        With return_mask the per-clause satisfied matrix is returned as well.
+        """
+        satisfied = self.clause_mask(assignments)
+        counts = satisfied.sum(axis=1)
+
+        if return_mask:
+            return counts, satisfied
+        return counts
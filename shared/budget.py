@@ -0,0 +1,100 @@
+from contextlib import contextmanager
+import signal
+import threading
+from time import perf_counter
+
+# Stop flag checked by every Budget in this process. parallel_runs replaces it with an Event shared by
+# all the workers of an experiment, so one run (or SIGINT in the parent) can stop them all.
+stop_event = threading.Event()
+
+# Set by parallel_runs when the first run to satisfy every clause should cancel the others.
+cancel_on_solve = False
+
+# The clock and the stop flag are looked at once every this many evaluations or checks.
+check_interval = 256
+
+
+class Budget:
+    """
+    Combined evaluation and wall-clock budget of one search run. max_evaluations or max_seconds
+    may be None for no limit, and the run stops at whichever limit it reaches first. The search
+    calls spend() for every evaluation and returns its best-so-far assignment as soon as exhausted()
+    is true, which also happens when a stop is requested (another run solved the instance, or
+    SIGINT inside interruptible()).
+    """
+
+    def __init__(self, max_evaluations=None, max_seconds=None):
+        self.max_evaluations = max_evaluations
+        self.max_seconds = max_seconds
+        self.start_time = perf_counter()
+        self.evaluations = 0
+        self.checks = 0
+        self.next_check = check_interval
+        self.stopped = False
+
+    def spend(self, amount=1):
+        self.evaluations += amount
+
+    def remaining_evaluations(self):
+        if self.max_evaluations is None:
+            return None
+        return max(self.max_evaluations - self.evaluations, 0)
+
+    def seconds(self):
+        return perf_counter() - self.start_time
+
+    def exhausted(self):
+        if self.stopped:
+            return True
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+
+        self.checks += 1
+        if self.checks < check_interval and self.evaluations < self.next_check:
+            return False
+        self.checks = 0
+        self.next_check = self.evaluations + check_interval
+
+        if stop_event.is_set() or (self.max_seconds is not None and self.seconds() >= self.max_seconds):
+            self.stopped = True
+        return self.stopped
+
+    def solved(self):
+        """
+        Called by a run that satisfied every clause, stops the concurrent runs if cancel_on_solve is set.
+        """
+        if cancel_on_solve:
+            stop_event.set()
+
+
+def request_stop():
+    stop_event.set()
+
+
+def stop_requested():
+    return stop_event.is_set()
+
+
+@contextmanager
+def interruptible(event=None):
+    """
+    Inside the block the first SIGINT (Ctrl-C) sets the stop event (event, or the current stop_event)
+    instead of raising KeyboardInterrupt, so the searches return their best-so-far assignments.
+    A second SIGINT raises KeyboardInterrupt as usual. Outside the main thread it does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle(signum, frame):
+        target = event if event is not None else stop_event
+        if target.is_set():
+            raise KeyboardInterrupt
+        print("Interrupted, stopping with the best solutions so far (Ctrl-C again to abort).")
+        target.set()
+
+    previous = signal.signal(signal.SIGINT, handle)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGINT, previous)
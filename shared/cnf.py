@@ -0,0 +1,218 @@
+from array import array
+import gzip
+import hashlib
+import mmap
+import os
+import struct
+
+# Compiled sidecar written next to each CNF file: header, int64 clause offsets, int32 literals
+# (padded to 8 bytes) and, for weighted files, int64 clause weights.
+cache_suffix = '.cnfc'
+cache_magic = b'CNFC'
+cache_version = 2
+cache_header = struct.Struct('<4sI32sQQQQQ')
+
+
+class CNF:
+    """
+    Clause database stored as two flat arrays: every literal of every clause in literals,
+    and the start of clause i at offsets[i] (offsets has one extra entry for the end).
+    The arrays are either array objects or memoryviews over a memory-mapped cache file.
+    Weighted (p wcnf) files also have the weight of clause i at weights[i], otherwise weights is None.
+    A mapped CNF cannot be pickled, shared.parallel sends it to worker processes by file name instead.
+    """
+
+    def __init__(self, num_variables, num_clauses, literals, offsets, filename=None, mapped=None, weights=None):
+        self.num_variables = num_variables
+        self.num_clauses = num_clauses
+        self.literals = literals
+        self.offsets = offsets
+        self.filename = filename
+        self.mapped = mapped
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, clause_index):
+        return self.literals[self.offsets[clause_index]:self.offsets[clause_index + 1]]
+
+    def __iter__(self):
+        for clause_index in range(len(self)):
+            yield self[clause_index]
+
+    def to_lists(self):
+        """
+        Returns the clauses as a list of lists of ints, the format the search algorithms use.
+        """
+        literals = self.literals.tolist()
+        offsets = self.offsets.tolist()
+        return [literals[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def weight_list(self):
+        """
+        Returns the clause weights as a list of ints, all 1 for an unweighted file.
+        """
+        if self.weights is None:
+            return [1] * len(self)
+        return self.weights.tolist()
+
+
+def open_dimacs(filename):
+    """
+    Opens a plain or gzip-compressed DIMACS file for reading text.
+    """
+    with open(filename, 'rb') as file:
+        compressed = file.read(2) == b'\x1f\x8b'
+    if compressed:
+        return gzip.open(filename, 'rt')
+    return open(filename, 'r')
+
+
+def parse_dimacs(filename):
+    """
+    Streams a DIMACS file into flat literal and offset arrays without building a list per clause.
+    Clauses may span several lines, each one ends with a 0.
+    In a weighted file (p wcnf) the first number of every clause is its weight.
+    """
+    num_variables = 0
+    num_clauses = 0
+    literals = array('i')
+    offsets = array('q', [0])
+    weights = None
+    weight = None
+
+    with open_dimacs(filename) as file:
+        for line in file:
+            line = line.strip()
+
+            # Ignores blank lines and comments, and stops at the % that ends the uf files.
+            if not line or line.startswith('c'):
+                continue
+            if line.startswith('%'):
+                break
+
+            if line.startswith('p'):
+                parts = line.split()
+                num_variables = int(parts[2])
+                num_clauses = int(parts[3])
+                if parts[1] == 'wcnf':
+                    weights = array('q')
+                continue
+
+            numbers = [int(part) for part in line.split()]
+            if weights is not None:
+                for number in numbers:
+                    if weight is None:
+                        weight = number
+                    elif number == 0:
+                        offsets.append(len(literals))
+                        weights.append(weight)
+                        weight = None
+                    else:
+                        literals.append(number)
+                continue
+
+            if numbers[-1] == 0 and 0 not in numbers[:-1]:
+                literals.extend(numbers[:-1])
+                offsets.append(len(literals))
+                continue
+
+            for number in numbers:
+                if number == 0:
+                    offsets.append(len(literals))
+                else:
+                    literals.append(number)
+
+    # An unterminated last clause still counts.
+    if len(literals) > offsets[-1]:
+        offsets.append(len(literals))
+        if weights is not None:
+            weights.append(weight)
+
+    # Skips empty clauses left by stray 0 lines.
+    if any(offsets[i] == offsets[i + 1] for i in range(len(offsets) - 1)):
+        kept = [i for i in range(len(offsets) - 1) if offsets[i] != offsets[i + 1]]
+        offsets = array('q', [offsets[0]] + [offsets[i + 1] for i in kept])
+        if weights is not None:
+            weights = array('q', [weights[i] for i in kept])
+
+    return CNF(num_variables, num_clauses, literals, offsets, filename, weights=weights)
+
+
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def write_cache(cnf, cache_filename, source_hash):
+    """
+    Writes the compiled sidecar, through a temporary file so readers never see half a cache.
+    """
+    temporary = f"{cache_filename}.{os.getpid()}.tmp"
+    num_weights = len(cnf.weights) if cnf.weights is not None else 0
+    with open(temporary, 'wb') as file:
+        file.write(cache_header.pack(cache_magic, cache_version, source_hash, cnf.num_variables, cnf.num_clauses, len(cnf), len(cnf.literals), num_weights))
+        file.write(array('q', cnf.offsets).tobytes())
+        file.write(array('i', cnf.literals).tobytes())
+        if num_weights:
+            if len(cnf.literals) % 2:
+                file.write(bytes(4))
+            file.write(array('q', cnf.weights).tobytes())
+    os.replace(temporary, cache_filename)
+
+
+def map_cache(cache_filename, source_hash, filename):
+    """
+    Memory-maps a compiled sidecar, zero copy. Returns None if it is missing, stale or damaged.
+    """
+    try:
+        with open(cache_filename, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(mapped) < cache_header.size:
+        mapped.close()
+        return None
+    magic, version, stored_hash, num_variables, num_clauses, num_stored, num_literals, num_weights = cache_header.unpack_from(mapped)
+    offsets_end = cache_header.size + 8 * (num_stored + 1)
+    literals_end = offsets_end + 4 * num_literals
+    weights_start = literals_end + 4 * (num_literals % 2) if num_weights else literals_end
+    if (magic != cache_magic or version != cache_version or stored_hash != source_hash
+            or len(mapped) != weights_start + 8 * num_weights):
+        mapped.close()
+        return None
+
+    view = memoryview(mapped)
+    offsets = view[cache_header.size:offsets_end].cast('q')
+    literals = view[offsets_end:literals_end].cast('i')
+    weights = view[weights_start:].cast('q') if num_weights else None
+    return CNF(num_variables, num_clauses, literals, offsets, filename, mapped, weights)
+
+
+def load_cnf(filename, use_cache=True):
+    """
+    Loads a plain or gzipped DIMACS file.
+    The first load writes a compiled sidecar (filename + '.cnfc'), later loads memory-map it as long as
+    the source file's SHA-256 still matches. Raises FileNotFoundError if the file does not exist.
+    """
+    if not use_cache:
+        return parse_dimacs(filename)
+
+    source_hash = file_hash(filename)
+    cache_filename = filename + cache_suffix
+    cnf = map_cache(cache_filename, source_hash, filename)
+    if cnf is not None:
+        return cnf
+
+    cnf = parse_dimacs(filename)
+    try:
+        write_cache(cnf, cache_filename, source_hash)
+    except OSError:
+        # Read-only locations just go without a cache.
+        return cnf
+    return map_cache(cache_filename, source_hash, filename) or cnf
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+
+from shared.assignment import Assignment, digits
+from shared.flip_engine import FlipEvaluator
+
+
+def pack_bits(solution):
+    """
+    Packs an Assignment or a 0/1 or bool sequence into an int with one bit per variable, used as the cache key.
+    """
+    if not len(solution):
+        return 0
+    bits = solution.bits if isinstance(solution, Assignment) else bytes(solution)
+    return int(bits.translate(digits), 2)
+
+
+class FitnessCache:
+    """
+    Bounded LRU cache of fitness (satisfied clauses) keyed by the packed assignment, for GAs whose
+    selection copies the same parents many times. Each entry also keeps the per-clause true-literal
+    counts, so a child that is not cached yet is scored as a delta from a cached parent: only the
+    clauses of the variables that differ are touched. Children that differ from every cached parent in
+    more than max_delta_fraction of the variables are scored from scratch.
+    hits, misses, delta_evaluations and full_evaluations count what happened, see stats().
+    """
+
+    def __init__(self, num_variables, clauses, max_size=1024, max_delta_fraction=0.25):
+        self.num_variables = num_variables
+        self.max_size = max_size
+        self.max_delta = max(1, int(num_variables * max_delta_fraction))
+        self.evaluator = FlipEvaluator(num_variables, clauses)
+        # Scratch assignment the evaluator flips, reused for every miss.
+        self.scratch = bytearray(num_variables)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.delta_evaluations = 0
+        self.full_evaluations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fitness(self, solution, parents=()):
+        """
+        Returns the number of clauses the solution satisfies, from the cache, as a delta from
+        the closest cached parent, or by a full evaluation.
+        """
+        key = pack_bits(solution)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+
+        closest = None
+        for parent in parents:
+            parent_entry = self.entries.get(pack_bits(parent))
+            if parent_entry is None:
+                continue
+            if isinstance(solution, Assignment) and isinstance(parent, Assignment):
+                changed = solution.differences(parent)
+            else:
+                changed = [var for var, (value, parent_value) in enumerate(zip(solution, parent)) if value != parent_value]
+            if closest is None or len(changed) < len(closest[2]):
+                closest = (parent, parent_entry, changed)
+
+        evaluator = self.evaluator
+        scratch = self.scratch
+        if closest is not None and len(closest[2]) <= self.max_delta:
+            parent, parent_entry, changed = closest
+            scratch[:] = parent.bits if isinstance(parent, Assignment) else bytes(parent)
+            evaluator.possibility = scratch
+            evaluator.true_counts = parent_entry[1][:]
+            evaluator.satisfied = parent_entry[0]
+            evaluator.flip_all(changed)
+            self.delta_evaluations += 1
+        else:
+            scratch[:] = solution.bits if isinstance(solution, Assignment) else bytes(solution)
+            evaluator.reset(scratch)
+            self.full_evaluations += 1
+
+        self.entries[key] = (evaluator.satisfied, evaluator.true_counts)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return evaluator.satisfied
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'delta_evaluations': self.delta_evaluations,
+            'full_evaluations': self.full_evaluations,
+            'size': len(self.entries),
+        }
@@ -0,0 +1,298 @@
+from shared.cnf import CNF
+
+
+class FlipEvaluator:
+    """
+    Incremental evaluation engine for bit-flip local search.
+    Keeps per-variable occurrence lists and per-clause true-literal counts, so the
+    effect of flipping a variable costs time proportional to its occurrences
+    instead of a full clause_counter scan.
+    clauses is a list of clauses or a shared.cnf.CNF, whose flat arrays are read in place.
+    """
+
+    def __init__(self, num_variables, clauses, possibility=None):
+        self.num_variables = num_variables
+        self.clauses = clauses
+        self.occurrences = [[] for _ in range(num_variables)]
+        self.repeated_variables = False
+
+        # Each occurrence is (clause index, value the variable needs for the literal to be true).
+        if isinstance(clauses, CNF):
+            literals = clauses.literals
+            offsets = clauses.offsets
+            for clause_index in range(len(clauses)):
+                start = offsets[clause_index]
+                end = offsets[clause_index + 1]
+                variables = set()
+                for position in range(start, end):
+                    literal = literals[position]
+                    self.occurrences[abs(literal) - 1].append((clause_index, 1 if literal > 0 else 0))
+                    variables.add(literal if literal > 0 else -literal)
+                if len(variables) != end - start:
+                    self.repeated_variables = True
+        else:
+            for clause_index, clause in enumerate(clauses):
+                for literal in clause:
+                    self.occurrences[abs(literal) - 1].append((clause_index, 1 if literal > 0 else 0))
+                if len({abs(literal) for literal in clause}) != len(clause):
+                    self.repeated_variables = True
+
+        self.possibility = None
+        self.true_counts = None
+        self.satisfied = 0
+        if possibility is not None:
+            self.reset(possibility)
+
+    def reset(self, possibility):
+        """
+        Loads a new assignment (a list or bytearray of 0s and 1s, e.g. Assignment.bits, used in place) and recounts every clause.
+        """
+        self.possibility = possibility
+        true_counts = self.true_counts = [0] * len(self.clauses)
+
+        for var, occurrences in enumerate(self.occurrences):
+            value = possibility[var]
+            for clause_index, sign in occurrences:
+                if sign == value:
+                    true_counts[clause_index] += 1
+
+        self.satisfied = len(true_counts) - true_counts.count(0)
+
+    def make_break(self, var):
+        """
+        Returns how many clauses flipping var would make satisfied and how many it would break.
+        """
+        if self.repeated_variables:
+            delta = self.flips_delta((var,))
+            return max(delta, 0), max(-delta, 0)
+
+        value = self.possibility[var]
+        true_counts = self.true_counts
+        make = 0
+        break_ = 0
+
+        for clause_index, sign in self.occurrences[var]:
+            if sign == value:
+                if true_counts[clause_index] == 1:
+                    break_ += 1
+            elif true_counts[clause_index] == 0:
+                make += 1
+
+        return make, break_
+
+    def flip_delta(self, var):
+        """
+        Change in the number of satisfied clauses if var were flipped.
+        """
+        make, break_ = self.make_break(var)
+        return make - break_
+
+    def flips_delta(self, variables):
+        """
+        Change in the number of satisfied clauses if all the given (distinct) variables were flipped together.
+        """
+        possibility = self.possibility
+        changes = {}
+
+        for var in variables:
+            value = possibility[var]
+            for clause_index, sign in self.occurrences[var]:
+                changes[clause_index] = changes.get(clause_index, 0) + (-1 if sign == value else 1)
+
+        true_counts = self.true_counts
+        delta = 0
+        for clause_index, change in changes.items():
+            before = true_counts[clause_index]
+            after = before + change
+            if before == 0 and after > 0:
+                delta += 1
+            elif before > 0 and after == 0:
+                delta -= 1
+
+        return delta
+
+    def flip(self, var):
+        """
+        Flips var in place and updates the clause counts.
+        """
+        possibility = self.possibility
+        true_counts = self.true_counts
+        value = possibility[var]
+        satisfied = self.satisfied
+
+        for clause_index, sign in self.occurrences[var]:
+            if sign == value:
+                true_counts[clause_index] -= 1
+                if true_counts[clause_index] == 0:
+                    satisfied -= 1
+            else:
+                true_counts[clause_index] += 1
+                if true_counts[clause_index] == 1:
+                    satisfied += 1
+
+        possibility[var] = 1 - value
+        self.satisfied = satisfied
+
+    def flip_all(self, variables):
+        """
+        Flips every given variable in place.
+        """
+        for var in variables:
+            self.flip(var)
+
+
+class ScoredFlipEvaluator(FlipEvaluator):
+    """
+    FlipEvaluator that also keeps the make and break count of every variable up to date,
+    so the score of any flip is a lookup. Each flip only updates the variables sharing a
+    clause with the flipped one, and those are listed in touched afterwards.
+    The unsatisfied clauses are kept in the list unsatisfied, with O(1) add and remove.
+    With clause weights, make and break are the summed weights of the clauses involved and
+    unsatisfied_weight is the total weight of the unsatisfied clauses. The weights can change (add_weight),
+    while input_weights (the starting weights unless given) stay fixed and unsatisfied_input_weight is the
+    total input weight of the unsatisfied clauses, the MaxSAT cost of the current assignment.
+    Clauses are normalised with the same indices: repeated literals are dropped and a clause with
+    both literals of a variable becomes an empty clause in tautologies, which always counts as satisfied.
+    """
+
+    def __init__(self, num_variables, clauses, possibility=None, weights=None, input_weights=None):
+        self.make = [0] * num_variables
+        self.break_ = [0] * num_variables
+        self.touched = []
+        self.weights = list(weights) if weights is not None else [1] * len(clauses)
+        self.input_weights = list(input_weights) if input_weights is not None else self.weights[:]
+        self.unsatisfied_weight = 0
+        self.unsatisfied_input_weight = 0
+        self.tautologies = []
+        normalised = []
+        for clause_index, clause in enumerate(clauses):
+            literals = list(dict.fromkeys(clause))
+            if any(-literal in literals for literal in literals):
+                self.tautologies.append(clause_index)
+                literals = []
+            normalised.append(literals)
+        super().__init__(num_variables, normalised)
+        if possibility is not None:
+            self.reset(possibility)
+
+    def reset(self, possibility):
+        super().reset(possibility)
+        # A tautology has no literals left, a true count of 1 keeps it satisfied since no flip touches it.
+        for clause_index in self.tautologies:
+            self.true_counts[clause_index] = 1
+        self.satisfied += len(self.tautologies)
+        make = self.make = [0] * self.num_variables
+        break_ = self.break_ = [0] * self.num_variables
+        weights = self.weights
+        self.unsatisfied = []
+        self.unsat_position = [-1] * len(self.clauses)
+        self.unsatisfied_weight = 0
+        self.unsatisfied_input_weight = 0
+
+        for clause_index, clause in enumerate(self.clauses):
+            count = self.true_counts[clause_index]
+            if count == 0:
+                self.unsat_position[clause_index] = len(self.unsatisfied)
+                self.unsatisfied.append(clause_index)
+                self.unsatisfied_weight += weights[clause_index]
+                self.unsatisfied_input_weight += self.input_weights[clause_index]
+                for literal in clause:
+                    make[abs(literal) - 1] += weights[clause_index]
+            elif count == 1 and clause:
+                break_[self.true_variable(clause_index)] += weights[clause_index]
+
+    def true_variable(self, clause_index, skip=None):
+        """
+        Returns a variable whose literal is true in the clause, other than skip.
+        """
+        possibility = self.possibility
+        for literal in self.clauses[clause_index]:
+            var = abs(literal) - 1
+            if var != skip and possibility[var] == (1 if literal > 0 else 0):
+                return var
+        return None
+
+    def make_break(self, var):
+        return self.make[var], self.break_[var]
+
+    def add_weight(self, clause_index, amount):
+        """
+        Changes the weight of a clause by amount and updates the scores that depend on it.
+        """
+        self.weights[clause_index] += amount
+        count = self.true_counts[clause_index]
+        if count == 0:
+            self.unsatisfied_weight += amount
+            for literal in self.clauses[clause_index]:
+                self.make[abs(literal) - 1] += amount
+        elif count == 1 and self.clauses[clause_index]:
+            self.break_[self.true_variable(clause_index)] += amount
+
+    def add_unsatisfied(self, clause_index):
+        self.unsat_position[clause_index] = len(self.unsatisfied)
+        self.unsatisfied.append(clause_index)
+
+    def remove_unsatisfied(self, clause_index):
+        position = self.unsat_position[clause_index]
+        last = self.unsatisfied.pop()
+        if last != clause_index:
+            self.unsatisfied[position] = last
+            self.unsat_position[last] = position
+        self.unsat_position[clause_index] = -1
+
+    def flip_delta(self, var):
+        return self.make[var] - self.break_[var]
+
+    def flip(self, var):
+        possibility = self.possibility
+        true_counts = self.true_counts
+        clauses = self.clauses
+        make = self.make
+        break_ = self.break_
+        weights = self.weights
+        value = possibility[var]
+        satisfied = self.satisfied
+        touched = [var]
+
+        for clause_index, sign in self.occurrences[var]:
+            count = true_counts[clause_index]
+            weight = weights[clause_index]
+
+            if sign == value:
+                # The literal of var goes from true to false.
+                if count == 1:
+                    satisfied -= 1
+                    self.add_unsatisfied(clause_index)
+                    self.unsatisfied_weight += weight
+                    self.unsatisfied_input_weight += self.input_weights[clause_index]
+                    break_[var] -= weight
+                    for literal in clauses[clause_index]:
+                        other = abs(literal) - 1
+                        make[other] += weight
+                        touched.append(other)
+                elif count == 2:
+                    other = self.true_variable(clause_index, var)
+                    break_[other] += weight
+                    touched.append(other)
+                true_counts[clause_index] = count - 1
+            else:
+                # The literal of var goes from false to true.
+                if count == 0:
+                    satisfied += 1
+                    self.remove_unsatisfied(clause_index)
+                    self.unsatisfied_weight -= weight
+                    self.unsatisfied_input_weight -= self.input_weights[clause_index]
+                    for literal in clauses[clause_index]:
+                        other = abs(literal) - 1
+                        make[other] -= weight
+                        touched.append(other)
+                    break_[var] += weight
+                elif count == 1:
+                    other = self.true_variable(clause_index, var)
+                    break_[other] -= weight
+                    touched.append(other)
+                true_counts[clause_index] = count + 1
+
+        possibility[var] = 1 - value
+        self.satisfied = satisfied
+        self.touched = touched
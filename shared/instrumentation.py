@@ -0,0 +1,77 @@
+import json
+from time import perf_counter
+
+from shared.results import encode_assignment
+
+counter_names = ('evaluations', 'accepted_moves', 'plateau_steps', 'restarts', 'generations')
+phase_names = ('init', 'neighbourhood', 'evaluation', 'bookkeeping')
+
+
+class Instrumentation:
+    """
+    Optional counters, phase timers and progress snapshots for the search loops.
+    The searches take instrumentation=None by default and then only pay for an
+    "is not None" test, so the hooks can stay in place in production code.
+
+    Snapshots of the best-so-far solution are sent to callback(snapshot) and/or appended
+    to a JSON-lines file, at most once every interval seconds plus once on close().
+    """
+
+    def __init__(self, callback=None, jsonl_path=None, interval=1.0):
+        self.counters = dict.fromkeys(counter_names, 0)
+        self.phase_seconds = dict.fromkeys(phase_names, 0.0)
+        self.callback = callback
+        self.file = open(jsonl_path, 'a') if jsonl_path else None
+        self.interval = interval
+        self.start_time = perf_counter()
+        self.last_snapshot = self.start_time
+        self.best_clauses = None
+        self.best_solution = None
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, phase, seconds):
+        self.phase_seconds[phase] = self.phase_seconds.get(phase, 0.0) + seconds
+
+    def progress(self, best_clauses, best_solution):
+        """
+        Records a best-so-far solution (kept by reference, so pass a list that is not modified later)
+        and emits a snapshot if the interval has passed.
+        """
+        if self.best_clauses is None or best_clauses > self.best_clauses:
+            self.best_clauses = best_clauses
+            self.best_solution = best_solution
+        self.tick()
+
+    def tick(self):
+        if perf_counter() - self.last_snapshot >= self.interval:
+            self.snapshot()
+
+    def snapshot(self):
+        now = perf_counter()
+        self.last_snapshot = now
+        snapshot = {
+            'seconds': now - self.start_time,
+            'counters': dict(self.counters),
+            'phase_seconds': dict(self.phase_seconds),
+            'best_clauses': self.best_clauses,
+            'best_solution': encode_assignment(self.best_solution) if self.best_solution is not None else None,
+        }
+
+        if self.callback is not None:
+            self.callback(snapshot)
+        if self.file is not None:
+            self.file.write(json.dumps(snapshot) + '\n')
+            self.file.flush()
+        return snapshot
+
+    def close(self):
+        """
+        Emits a final snapshot and closes the JSON-lines file.
+        """
+        snapshot = self.snapshot()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        return snapshot
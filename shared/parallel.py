@@ -0,0 +1,143 @@
+import hashlib
+import multiprocessing
+import random
+import signal
+import sys
+import threading
+
+from shared import budget
+from shared.budget import interruptible
+from shared.cnf import CNF, load_cnf
+from shared.instrumentation import Instrumentation
+from shared.results import ResultsWriter
+
+# Set once per worker process by init_worker, so the clause data is only sent once per worker.
+_worker_function = None
+_worker_args = ()
+_worker_progress_path = None
+
+
+def new_base_seed():
+    """
+    Picks a random base seed for an experiment, print or store it to reproduce the runs.
+    """
+    return random.randrange(2 ** 32)
+
+
+def run_seed(base_seed, run_num):
+    """
+    Deterministic seed of one run, derived from the experiment's base seed.
+    """
+    digest = hashlib.sha256(f"{base_seed}:{run_num}".encode()).digest()
+    return int.from_bytes(digest[:4], 'little')
+
+
+def init_worker(function, args, stop_event=None, cancel_on_solve=False, mapped=(), progress_path=None):
+    global _worker_function, _worker_args, _worker_progress_path
+    _worker_function = function
+    _worker_progress_path = progress_path
+    # The arguments at the mapped positions are file names of memory-mapped CNFs, which every worker maps
+    # again, so all of them read one copy of the compiled cache through the page cache.
+    _worker_args = tuple(load_cnf(arg) if index in mapped else arg for index, arg in enumerate(args))
+    budget.cancel_on_solve = cancel_on_solve
+    if stop_event is not None:
+        budget.stop_event = stop_event
+        # Only the parent handles Ctrl-C, it stops the workers through the shared event.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_task(task):
+    """
+    Seeds the random generators for one run and calls the worker function as function(run_num, *args),
+    with instrumentation= the run's own Instrumentation when progress is recorded.
+    Returns None without running if a stop was already requested.
+    """
+    run_num, seed = task
+    if budget.stop_event.is_set():
+        return None
+    random.seed(seed)
+    numpy = sys.modules.get('numpy')
+    if numpy is not None:
+        numpy.random.seed(seed)
+    if _worker_progress_path is None:
+        return _worker_function(run_num, *_worker_args)
+
+    instrumentation = Instrumentation(jsonl_path=_worker_progress_path.format(run=run_num + 1))
+    try:
+        return _worker_function(run_num, *_worker_args, instrumentation=instrumentation)
+    finally:
+        instrumentation.close()
+
+
+def parallel_runs(function, num_runs, args=(), base_seed=0, processes=None, cancel_on_solve=False, progress_path=None):
+    """
+    Runs function(run_num, *args) for every run across a process pool and yields the results in run order.
+    function must be defined at module level so it can be sent to the workers.
+    processes defaults to the number of cores, with processes=1 the runs are done in this process.
+    Each run seeds random (and NumPy) with run_seed(base_seed, run_num), so the base seed reproduces the experiment.
+    A memory-mapped shared.cnf.CNF among args is sent to the workers as its file name and mapped by each of them.
+    With progress_path, every run gets a shared.instrumentation.Instrumentation (passed as instrumentation=)
+    that writes its snapshots to progress_path with {run} replaced by the run number, e.g. 'tabu_run{run}.jsonl'.
+
+    All the runs share one stop event, read by every shared.budget.Budget. Ctrl-C sets it, so the running
+    searches return their best-so-far results. With cancel_on_solve, the first run that calls Budget.solved()
+    sets it too. Runs that had not started when it was set yield None.
+    """
+    tasks = [(run_num, run_seed(base_seed, run_num)) for run_num in range(num_runs)]
+
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    processes = min(processes, num_runs)
+
+    previous_event = budget.stop_event
+    try:
+        if processes <= 1:
+            budget.stop_event = threading.Event()
+            init_worker(function, args, None, cancel_on_solve, (), progress_path)
+            with interruptible():
+                for task in tasks:
+                    yield run_task(task)
+            return
+
+        mapped = [index for index, arg in enumerate(args) if isinstance(arg, CNF) and arg.mapped is not None]
+        worker_args = tuple(arg.filename if index in mapped else arg for index, arg in enumerate(args))
+        budget.stop_event = multiprocessing.Event()
+        with multiprocessing.Pool(processes, initializer=init_worker, initargs=(function, worker_args, budget.stop_event, cancel_on_solve, mapped, progress_path)) as pool, interruptible():
+            yield from pool.imap(run_task, tasks)
+    finally:
+        budget.stop_event = previous_event
+        budget.cancel_on_solve = False
+
+
+def record_runs(function, num_runs, args, algorithm, output_csv, seed=None, processes=None, instance='', cancel_on_solve=False, progress_path=None):
+    """
+    Runs function(run_num, *args) num_runs times with parallel_runs and writes one shared.results row per run to
+    output_csv, which is started afresh. function returns (solution, satisfied clauses, evaluations, seconds),
+    followed by the satisfied weight on weighted MaxSAT instances.
+    Ctrl-C (see shared.budget.interruptible) stops the runs with their best-so-far results, and with cancel_on_solve
+    the first run that solves the formula stops the others. Stopped runs are written, runs that never started are not.
+    seed is the base seed of the runs (a new one unless given) and progress_path records the progress of every
+    run, see parallel_runs.
+    Returns the solution, satisfied clauses, evaluations and weight (None when unweighted) of the best run:
+    the one with the highest weight if the runs report one, otherwise the one that satisfied the most clauses.
+    """
+    best = ([], 0, 0, None)
+    if seed is None:
+        seed = new_base_seed()
+
+    with ResultsWriter(output_csv, append=False) as writer:
+        for run, result in enumerate(parallel_runs(function, num_runs, args, seed, processes, cancel_on_solve, progress_path)):
+            if result is None:
+                continue
+            solution, satisfied_clauses, function_evaluations, run_time = result[:4]
+            weight = result[4] if len(result) > 4 else None
+            writer.write(instance, algorithm, run_seed(seed, run), run + 1, satisfied_clauses, function_evaluations, run_time, solution, weight)
+
+            if weight is not None:
+                better = best[3] is None or (weight, satisfied_clauses) > (best[3], best[1])
+            else:
+                better = satisfied_clauses > best[1]
+            if better:
+                best = (solution, satisfied_clauses, function_evaluations, weight)
+
+    return best
@@ -0,0 +1,290 @@
+"""
+Satisfiability-preserving simplification of a CNF formula before search.
+
+    python -m shared.preprocess file.cnf [reduced.cnf]
+
+preprocess() removes tautologies and duplicate clauses, then repeats unit propagation, pure literal
+elimination, subsumption and bounded variable elimination until nothing changes. The searches run on the
+reduced formula and Reduction.restore() maps their assignment back to the original variables: a model of the
+reduced formula becomes a model of the original one. The reduced formula is only equisatisfiable, so the
+number of satisfied clauses of a partial solution is recounted on the original clauses (restore_result).
+Clause weights are not preserved, so weighted MaxSAT instances should be searched unreduced.
+"""
+import sys
+
+# Bounded variable elimination only tries variables with at most this many occurrences,
+# and only keeps an elimination that does not increase the number of clauses.
+max_elimination_occurrences = 16
+max_resolvent_length = 16
+
+
+class Reduction:
+    """
+    A reduced formula (num_variables, clauses, renumbered from 1) and what is needed to map its
+    solutions back: the original clauses, the original variable of each reduced one (variable_map)
+    and the fix and elimination steps in the order they were made.
+    """
+
+    def __init__(self, original_num_variables, original_clauses, num_variables, clauses, variable_map, steps, unsatisfiable=False):
+        self.original_num_variables = original_num_variables
+        self.original_clauses = original_clauses
+        self.num_variables = num_variables
+        self.clauses = clauses
+        self.variable_map = variable_map
+        self.steps = steps
+        self.unsatisfiable = unsatisfiable
+
+    def restore(self, solution):
+        """
+        Maps an assignment of the reduced variables (0/1 or bools) to an assignment of the original ones.
+        Variables that dropped out of the formula without being fixed are set to 0.
+        """
+        assignment = [0] * self.original_num_variables
+        for index, var in enumerate(self.variable_map):
+            assignment[var - 1] = 1 if solution[index] else 0
+
+        # Undone last to first, so every step sees the values of the variables removed after it.
+        for step in reversed(self.steps):
+            if step[0] == 'fix':
+                _, var, value = step
+                assignment[var - 1] = value
+            else:
+                _, var, clauses = step
+                assignment[var - 1] = eliminated_value(var, clauses, assignment)
+
+        return assignment
+
+    def restore_result(self, solution):
+        """
+        Returns the restored assignment and the number of original clauses it satisfies.
+        """
+        assignment = self.restore(solution)
+        return assignment, count_satisfied(self.original_clauses, assignment)
+
+
+def literal_true(literal, assignment):
+    return assignment[abs(literal) - 1] == (1 if literal > 0 else 0)
+
+
+def count_satisfied(clauses, assignment):
+    return sum(1 for clause in clauses if any(literal_true(literal, assignment) for literal in clause))
+
+
+def eliminated_value(var, clauses, assignment):
+    """
+    Value of an eliminated variable that satisfies the most of the clauses it was removed with.
+    If the reduced formula is satisfied, this satisfies all of them.
+    """
+    needs_true = 0
+    needs_false = 0
+    for clause in clauses:
+        if any(abs(literal) != var and literal_true(literal, assignment) for literal in clause):
+            continue
+        if var in clause:
+            needs_true += 1
+        else:
+            needs_false += 1
+    return 1 if needs_true > needs_false else 0
+
+
+class Simplifier:
+    """
+    Clause database with occurrence lists used by preprocess(). Clauses are frozensets of literals,
+    stored by id so a clause can be removed from every occurrence list in O(length).
+    """
+
+    def __init__(self, clauses):
+        self.clauses = {}
+        self.ids = {}
+        self.occurs = {}
+        self.next_id = 0
+        self.assigned = {}
+        self.units = []
+        self.steps = []
+        self.unsatisfiable = False
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_clause(self, literals):
+        clause = frozenset(literals)
+        if any(-literal in clause for literal in clause) or clause in self.ids:
+            return False
+        if not clause:
+            self.unsatisfiable = True
+            return False
+
+        clause_id = self.next_id
+        self.next_id += 1
+        self.clauses[clause_id] = clause
+        self.ids[clause] = clause_id
+        for literal in clause:
+            self.occurs.setdefault(literal, set()).add(clause_id)
+        if len(clause) == 1:
+            self.units.append(next(iter(clause)))
+        return True
+
+    def remove_clause(self, clause_id):
+        clause = self.clauses.pop(clause_id)
+        del self.ids[clause]
+        for literal in clause:
+            self.occurs[literal].discard(clause_id)
+        return clause
+
+    def occurrences(self, literal):
+        return self.occurs.get(literal, ())
+
+    def assign(self, literal):
+        """
+        Makes literal true: drops the clauses it satisfies and removes its negation from the others.
+        """
+        var = abs(literal)
+        value = 1 if literal > 0 else 0
+        if var in self.assigned:
+            if self.assigned[var] != value:
+                self.unsatisfiable = True
+            return
+        self.assigned[var] = value
+        self.steps.append(('fix', var, value))
+
+        for clause_id in list(self.occurrences(literal)):
+            self.remove_clause(clause_id)
+        for clause_id in list(self.occurrences(-literal)):
+            clause = self.remove_clause(clause_id)
+            self.add_clause(clause - {-literal})
+
+    def propagate(self):
+        changed = False
+        while self.units and not self.unsatisfiable:
+            literal = self.units.pop()
+            # The unit clause may have been removed since it was queued.
+            if frozenset((literal,)) in self.ids:
+                self.assign(literal)
+                changed = True
+        return changed
+
+    def pure_literals(self):
+        changed = False
+        for var in {abs(literal) for literal in self.occurs}:
+            if var in self.assigned:
+                continue
+            positive = bool(self.occurrences(var))
+            negative = bool(self.occurrences(-var))
+            if positive != negative:
+                self.assign(var if positive else -var)
+                changed = True
+        return changed
+
+    def subsume(self):
+        """
+        Removes every clause that contains another clause.
+        """
+        changed = False
+        for clause_id in sorted(self.clauses, key=lambda clause_id: len(self.clauses[clause_id])):
+            clause = self.clauses.get(clause_id)
+            if clause is None:
+                continue
+            rarest = min(clause, key=lambda literal: len(self.occurrences(literal)))
+            for other_id in list(self.occurrences(rarest)):
+                if other_id != clause_id and len(self.clauses[other_id]) >= len(clause) and clause <= self.clauses[other_id]:
+                    self.remove_clause(other_id)
+                    changed = True
+        return changed
+
+    def eliminate(self, var):
+        """
+        Replaces the clauses of var by all their non-tautological resolvents on var, if that does not add clauses.
+        """
+        positive = [self.clauses[clause_id] for clause_id in self.occurrences(var)]
+        negative = [self.clauses[clause_id] for clause_id in self.occurrences(-var)]
+        if not positive or not negative or len(positive) + len(negative) > max_elimination_occurrences:
+            return False
+
+        limit = len(positive) + len(negative)
+        resolvents = set()
+        for first in positive:
+            for second in negative:
+                resolvent = (first - {var}) | (second - {-var})
+                if any(-literal in resolvent for literal in resolvent):
+                    continue
+                if len(resolvent) > max_resolvent_length:
+                    return False
+                resolvents.add(resolvent)
+                if len(resolvents) > limit:
+                    return False
+
+        self.steps.append(('eliminate', var, [sorted(clause) for clause in positive + negative]))
+        self.assigned[var] = None
+        for clause_id in list(self.occurrences(var)) + list(self.occurrences(-var)):
+            self.remove_clause(clause_id)
+        for resolvent in resolvents:
+            self.add_clause(resolvent)
+        return True
+
+    def eliminate_variables(self):
+        changed = False
+        candidates = {abs(literal) for literal in self.occurs if self.occurs[literal]}
+        for var in sorted(candidates, key=lambda var: len(self.occurrences(var)) + len(self.occurrences(-var))):
+            if self.unsatisfiable:
+                break
+            if var not in self.assigned and self.eliminate(var):
+                changed = True
+                self.propagate()
+        return changed
+
+
+def preprocess(num_variables, clauses, eliminate=True):
+    """
+    Simplifies the formula (a list of lists of literals) and returns a Reduction.
+    If a conflict shows the formula is unsatisfiable, the Reduction keeps the original
+    formula unchanged with unsatisfiable set, so the searches can still maximise it.
+    """
+    simplifier = Simplifier(clauses)
+    changed = True
+    while changed and not simplifier.unsatisfiable:
+        changed = simplifier.propagate()
+        changed = simplifier.pure_literals() or changed
+        changed = simplifier.subsume() or changed
+        if eliminate and not simplifier.unsatisfiable:
+            changed = simplifier.eliminate_variables() or changed
+
+    if simplifier.unsatisfiable:
+        return Reduction(num_variables, clauses, num_variables, clauses, list(range(1, num_variables + 1)), [], True)
+
+    reduced = [sorted(clause, key=abs) for clause in simplifier.clauses.values()]
+    variable_map = sorted({abs(literal) for clause in reduced for literal in clause})
+    new_index = {var: index + 1 for index, var in enumerate(variable_map)}
+    reduced = [[new_index[abs(literal)] * (1 if literal > 0 else -1) for literal in clause] for clause in reduced]
+    return Reduction(num_variables, clauses, len(variable_map), reduced, variable_map, simplifier.steps)
+
+
+def write_dimacs(filename, num_variables, clauses):
+    with open(filename, 'w') as file:
+        file.write(f"p cnf {num_variables} {len(clauses)}\n")
+        for clause in clauses:
+            file.write(' '.join(str(literal) for literal in clause) + ' 0\n')
+
+
+def main():
+    """
+    Prints how much a DIMACS file shrinks, and writes the reduced formula if a second file name is given.
+    """
+    from shared.cnf import load_cnf
+
+    cnf = load_cnf(sys.argv[1])
+    clauses = cnf.to_lists()
+    reduction = preprocess(cnf.num_variables, clauses)
+    if reduction.unsatisfiable:
+        print("The formula is unsatisfiable (conflict found while simplifying).")
+        return
+
+    fixed = sum(1 for step in reduction.steps if step[0] == 'fix')
+    eliminated = len(reduction.steps) - fixed
+    print(f"Variables: {cnf.num_variables} -> {reduction.num_variables} ({fixed} fixed, {eliminated} eliminated)")
+    print(f"Clauses: {len(clauses)} -> {len(reduction.clauses)}")
+    print(f"Literals: {sum(map(len, clauses))} -> {sum(map(len, reduction.clauses))}")
+    if len(sys.argv) > 2:
+        write_dimacs(sys.argv[2], reduction.num_variables, reduction.clauses)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import csv
+import os
+import sys
+
+# One row per run. The solution is a packed bitstring, see encode_assignment.
+# weight is the satisfied input weight on weighted MaxSAT instances and empty otherwise.
+# evaluations is each algorithm's own unit of work, so it only compares runs of the same algorithm:
+# hill climbing (next ascent, VNA, ILS) counts every neighbour it scores, the flip-based searches
+# (WalkSAT, ProbSAT, tabu, PAWS, SAPS) count every flip they make and the GA every individual it scores.
+fields = ['instance', 'algorithm', 'seed', 'run', 'clauses', 'weight', 'evaluations', 'seconds', 'solution']
+int_fields = ('seed', 'run', 'clauses', 'evaluations')
+
+
+def encode_assignment(assignment):
+    """
+    Packs an assignment (0/1 or bools) into '<number of variables>:<hex digits>', variable 1 being the highest bit.
+    """
+    if not assignment:
+        return '0:'
+    value = int(''.join('1' if val else '0' for val in assignment), 2)
+    return f"{len(assignment)}:{value:0{(len(assignment) + 3) // 4}x}"
+
+
+def decode_assignment(text):
+    """
+    Unpacks an encode_assignment string back into a list of 0s and 1s.
+    """
+    length, digits = text.split(':')
+    length = int(length)
+    if not length:
+        return []
+    return [int(bit) for bit in format(int(digits, 16), f'0{length}b')]
+
+
+class ResultsWriter:
+    """
+    Keeps one buffered CSV file open for a whole experiment and writes one tidy row per run.
+    The header is written only when the file is new or empty, so experiments can append to the same file.
+    Appending to a file with a different header (e.g. an older layout) raises ValueError instead of mixing layouts.
+    """
+
+    def __init__(self, path, append=True):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        new_file = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new_file:
+            with open(path, newline='') as file:
+                header = next(csv.reader(file), [])
+            if header != fields:
+                raise ValueError(f"'{path}' does not have the results header {','.join(fields)}, use a new file name.")
+        self.file = open(path, mode='a' if append else 'w', newline='', buffering=1 << 16)
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(fields)
+
+    def write(self, instance, algorithm, seed, run, clauses, evaluations, seconds, solution, weight=None):
+        self.writer.writerow([instance, algorithm, seed, run, clauses, '' if weight is None else weight, evaluations, f"{seconds:.6f}", encode_assignment(solution)])
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def iter_results(paths):
+    """
+    Streams the rows of one or more result files as dicts with numeric fields converted, weight being None when empty.
+    The solution stays encoded, decode_assignment unpacks it when needed.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+
+    for path in paths:
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                for field in int_fields:
+                    row[field] = int(row[field])
+                row['seconds'] = float(row['seconds'])
+                weight = row['weight']
+                row['weight'] = None if not weight else int(weight) if weight.lstrip('-').isdigit() else float(weight)
+                yield row
+
+
+def summarise_results(paths):
+    """
+    Aggregates result files per (instance, algorithm) in one streaming pass, without loading them whole.
+    """
+    summary = {}
+
+    for row in iter_results(paths):
+        key = (row['instance'], row['algorithm'])
+        entry = summary.get(key)
+        if entry is None:
+            entry = summary[key] = {'runs': 0, 'best_clauses': 0, 'best_weight': None, 'total_clauses': 0, 'total_evaluations': 0, 'total_seconds': 0.0}
+        entry['runs'] += 1
+        entry['best_clauses'] = max(entry['best_clauses'], row['clauses'])
+        if row['weight'] is not None and (entry['best_weight'] is None or row['weight'] > entry['best_weight']):
+            entry['best_weight'] = row['weight']
+        entry['total_clauses'] += row['clauses']
+        entry['total_evaluations'] += row['evaluations']
+        entry['total_seconds'] += row['seconds']
+
+    for entry in summary.values():
+        entry['mean_clauses'] = entry['total_clauses'] / entry['runs']
+        entry['mean_evaluations'] = entry['total_evaluations'] / entry['runs']
+        entry['mean_seconds'] = entry['total_seconds'] / entry['runs']
+
+    return summary
+
+
+def main():
+    """
+    Prints the summary of the result files given on the command line.
+    """
+    print(f"{'instance':20} {'algorithm':28} {'runs':>5} {'best':>6} {'mean':>9} {'evaluations':>12} {'seconds':>9}")
+    for (instance, algorithm), entry in sorted(summarise_results(sys.argv[1:]).items()):
+        print(f"{instance:20} {algorithm:28} {entry['runs']:5} {entry['best_clauses']:6} {entry['mean_clauses']:9.2f} "
+              f"{entry['mean_evaluations']:12.0f} {entry['mean_seconds']:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+The lab searches behind one calling convention, for the scripts that run them without the menus
+(batch, portfolio and benchmarks).
+
+Every solver takes (num_variables, num_clauses, clauses, weights, budget, instrumentation=None) and its own
+keyword parameters, and returns (solution, satisfied clauses, evaluations). weights are the input weights of
+a weighted instance, or None, and only the clause-weighting searches use them.
+"""
+import os
+import sys
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(root, 'Lab2'))
+sys.path.insert(0, os.path.join(root, 'Lab3'))
+
+import lab2
+import lab3_genetic
+import lab3_tabu
+import lab3_weighting
+
+
+def run_next_ascent(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab2.multistart_run(0, num_variables, num_clauses, clauses, False, True, instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_vna(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab2.multistart_run(0, num_variables, num_clauses, clauses, True, True, instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_walksat(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab2.focused_run(0, num_variables, num_clauses, clauses, 'walksat', instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_probsat(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab2.focused_run(0, num_variables, num_clauses, clauses, 'probsat', instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_ils(num_variables, num_clauses, clauses, weights, budget, instrumentation=None, acceptance='better'):
+    solution, satisfied, evaluations, _, _ = lab2.ils_run(0, num_variables, num_clauses, clauses, lab2.ils_variable_neighbourhood, acceptance, instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_tabu(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    return lab3_tabu.tabu(num_variables, clauses, instrumentation, budget)
+
+
+def run_paws(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab3_weighting.clause_weighting(num_variables, clauses, weights, 'paws', instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_saps(num_variables, num_clauses, clauses, weights, budget, instrumentation=None):
+    solution, satisfied, evaluations, _ = lab3_weighting.clause_weighting(num_variables, clauses, weights, 'saps', instrumentation, budget)
+    return solution, satisfied, evaluations
+
+
+def run_genetic(num_variables, num_clauses, clauses, weights, budget, instrumentation=None, pop_size=100, num_generations=1000, mutation_rate=0.01, crossover_type='one_point'):
+    if lab3_genetic.np is not None:
+        solution, satisfied = lab3_genetic.vectorized_genetic_algorithm(clauses, num_variables, pop_size, num_generations, mutation_rate, crossover_type, instrumentation, budget)
+    else:
+        solution, satisfied = lab3_genetic.genetic_algorithm(clauses, num_variables, pop_size, num_generations, mutation_rate, instrumentation, budget)
+    return [int(value) for value in solution], int(satisfied), budget.evaluations
+
+
+# Name -> (module whose settings the parameters may override, solver, keyword parameters of the solver).
+registry = {
+    'next_ascent': (lab2, run_next_ascent, ()),
+    'vna': (lab2, run_vna, ()),
+    'walksat': (lab2, run_walksat, ()),
+    'probsat': (lab2, run_probsat, ()),
+    'ils': (lab2, run_ils, ('acceptance',)),
+    'tabu': (lab3_tabu, run_tabu, ()),
+    'paws': (lab3_weighting, run_paws, ()),
+    'saps': (lab3_weighting, run_saps, ()),
+    'genetic': (lab3_genetic, run_genetic, ('pop_size', 'num_generations', 'mutation_rate', 'crossover_type')),
+}
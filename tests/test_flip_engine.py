@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+sys.path.insert(0, os.path.join(root, 'Lab2'))
+sys.path.insert(0, os.path.join(root, 'Lab3'))
+
+import lab2
+import lab3_genetic
+import lab3_tabu
+from shared.budget import Budget
+from shared.cnf import load_cnf
+from shared.flip_engine import FlipEvaluator, ScoredFlipEvaluator
+
+
+def check_scores(evaluator, clauses):
+    """
+    Compares the incremental state with a recount of the original clauses.
+    """
+    possibility = evaluator.possibility
+    assert evaluator.satisfied == lab2.clause_counter(possibility, clauses)
+    unsatisfied = [clause_index for clause_index, clause in enumerate(clauses) if not lab2.num_clauses_satisfied(clause, possibility)]
+    assert sorted(evaluator.unsatisfied) == unsatisfied
+    for var in range(evaluator.num_variables):
+        possibility[var] ^= 1
+        delta = lab2.clause_counter(possibility, clauses) - evaluator.satisfied
+        possibility[var] ^= 1
+        assert evaluator.flip_delta(var) == delta
+
+
+def flip_randomly(clauses, num_variables, seed):
+    random.seed(seed)
+    evaluator = ScoredFlipEvaluator(num_variables, clauses, [random.randint(0, 1) for _ in range(num_variables)])
+    check_scores(evaluator, clauses)
+    for _ in range(50):
+        evaluator.flip(random.randrange(num_variables))
+        check_scores(evaluator, clauses)
+
+
+def test_repeated_literal():
+    clauses = [[1, 1, -2], [2, 3], [-1, -3, -3]]
+    for seed in range(5):
+        flip_randomly(clauses, 3, seed)
+
+
+def test_tautology():
+    clauses = [[1, -1], [2, -3], [-2, 1, -1], [3]]
+    for seed in range(5):
+        flip_randomly(clauses, 3, seed)
+
+    evaluator = ScoredFlipEvaluator(3, clauses, [0, 0, 0], weights=[5, 1, 2, 1])
+    assert evaluator.satisfied == 3
+    assert evaluator.unsatisfied_weight == 1
+    evaluator.add_weight(0, 3)
+    assert evaluator.make_break(0) == (0, 0)
+
+
+def test_tabu_accepts_repeated_variables():
+    clauses = [[1, 1, -2], [1, -1], [2, 3], [-3, -1]]
+    random.seed(0)
+    solution, satisfied, _ = lab3_tabu.tabu(3, clauses, budget=Budget(1000))
+    assert satisfied == len(clauses) == lab2.clause_counter(solution, clauses)
+
+
+def test_input_weight_follows_flips():
+    random.seed(3)
+    clauses = [[random.choice((1, -1)) * random.randint(1, 6) for _ in range(3)] for _ in range(30)]
+    input_weights = [random.randint(1, 9) for _ in clauses]
+    evaluator = ScoredFlipEvaluator(6, clauses, [0] * 6, input_weights)
+    for _ in range(100):
+        if random.random() < 0.3:
+            evaluator.add_weight(random.randrange(len(clauses)), random.randint(1, 5))
+        else:
+            evaluator.flip(random.randrange(6))
+        unsatisfied = [clause_index for clause_index, clause in enumerate(clauses) if not lab2.num_clauses_satisfied(clause, evaluator.possibility)]
+        assert evaluator.unsatisfied_input_weight == sum(input_weights[clause_index] for clause_index in unsatisfied)
+
+
+def test_cnf_arrays_match_lists(tmp_path):
+    path = tmp_path / 'small.cnf'
+    path.write_text('p cnf 4 4\n1 1 -2 0\n2 3\n-4 0\n-1 -3 4 0\n')
+    cnf = load_cnf(str(path))
+    assert cnf.mapped is not None
+    clauses = cnf.to_lists()
+    from_arrays = FlipEvaluator(4, cnf, [1, 0, 1, 0])
+    from_lists = FlipEvaluator(4, clauses, [1, 0, 1, 0])
+    assert from_arrays.occurrences == from_lists.occurrences
+    assert from_arrays.true_counts == from_lists.true_counts
+    assert from_arrays.repeated_variables and from_lists.repeated_variables
+
+    if lab3_genetic.BatchEvaluator is not None:
+        population = [[random.randint(0, 1) for _ in range(4)] for _ in range(20)]
+        scores = lab3_genetic.BatchEvaluator(cnf).score(population).tolist()
+        assert scores == [lab2.clause_counter(row, clauses) for row in population]